@@ -11,12 +11,19 @@ It performs USB capture, ESC/P command parsing, and provides interactive testing
 import os
 import sys
 import argparse
-import subprocess
 import time
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
 
+# Captures shorter than this (in seconds) are not worth the cost of starting
+# a worker process to parse alongside them
+MIN_CONCURRENT_DURATION = 5
+
+@lru_cache(maxsize=None)
 def check_dependencies():
-    """Check if all required dependencies are installed"""
+    """Check if PyUSB is installed (only needed by the capture and interactive steps)"""
     try:
         import usb.core
     except ImportError:
@@ -28,75 +35,53 @@ def check_dependencies():
 
 def run_capture(duration, output_dir=None):
     """Run the USB capture tool"""
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
-    # Generate timestamp for filenames
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Have the capture tool write straight into the output directory; without
+    # one it picks its own timestamped name
+    output_file = None
+    if output_dir:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = str(output_dir / f"dtg_usb_capture_{timestamp}.json")
     
     try:
-        # Build the command
-        cmd = [sys.executable, "tools/usb_capture.py", "-d", str(duration)]
+        from tools import usb_capture
         
         print(f"Starting USB capture for {duration} seconds...")
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        # Wait for completion
-        stdout, stderr = process.communicate()
-        
-        print(stdout)
-        if stderr:
-            print(f"Errors during capture: {stderr}")
-            
-        # Look for the output file in the stdout
-        capture_file = None
-        for line in stdout.split('\n'):
-            if "Capture data saved to" in line:
-                capture_file = line.split("to ")[-1].strip()
-                break
-                
-        if capture_file and output_dir:
-            # Move to output directory if specified
-            new_path = os.path.join(output_dir, os.path.basename(capture_file))
-            os.rename(capture_file, new_path)
-            capture_file = new_path
+        _, capture_file = usb_capture.capture_session(duration=duration, output_file=output_file)
             
         return capture_file
             
+    except SystemExit:
+        # The tool has already reported why it could not start
+        return None
     except Exception as e:
         print(f"Error running capture: {e}")
         return None
 
 def run_parser(input_file, output_dir=None):
     """Run the ESC/P parser tool on the captured data"""
-    if not input_file or not os.path.exists(input_file):
-        print(f"Error: Input file {input_file} not found")
+    if not input_file:
+        print("Error: No input file specified")
         return None
         
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
     # Generate output filename
-    output_file = os.path.splitext(os.path.basename(input_file))[0] + "_parsed.json"
+    output_file = Path(Path(input_file).stem + "_parsed.json")
     if output_dir:
-        output_file = os.path.join(output_dir, output_file)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = output_dir / output_file
         
     try:
-        # Build the command
-        cmd = [sys.executable, "tools/escp_parser.py", input_file, "-o", output_file]
+        from tools import escp_parser
         
         print(f"Parsing captured data from {input_file}...")
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        
-        # Wait for completion
-        stdout, stderr = process.communicate()
-        
-        print(stdout)
-        if stderr:
-            print(f"Errors during parsing: {stderr}")
+        # The parser reports a missing input file itself
+        if escp_parser.main([str(input_file), "-o", str(output_file)]) != 0:
+            return None
             
-        if os.path.exists(output_file):
-            return output_file
+        if output_file.exists():
+            return str(output_file)
         else:
             return None
             
@@ -104,20 +89,35 @@ def run_parser(input_file, output_dir=None):
         print(f"Error running parser: {e}")
         return None
 
+def parse_workers(jobs, file_count):
+    """Return how many parser processes to use (jobs <= 0 means one per spare CPU)"""
+    if jobs <= 0:
+        # Leave a core free for the capture
+        jobs = max(1, (os.cpu_count() or 1) - 1)
+    return max(1, min(jobs, file_count))
+
+def run_parsers(input_files, output_dir=None, jobs=0):
+    """Run the ESC/P parser on several files, in parallel when more than one"""
+    workers = parse_workers(jobs, len(input_files))
+    if workers == 1:
+        return [run_parser(input_file, output_dir) for input_file in input_files]
+        
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(run_parser, output_dir=output_dir), input_files))
+
 def run_interactive_mode():
     """Run the printer commander in interactive mode"""
     try:
-        # Build the command
-        cmd = [sys.executable, "tools/printer_commander.py", "--init", "--interactive"]
+        from tools import printer_commander
         
         print("Starting interactive printer command mode...")
         print("(This will initialize the printer and allow testing commands)")
         
-        # Run interactively with direct I/O
-        process = subprocess.run(cmd)
-        
-        return process.returncode == 0
+        return printer_commander.main(["--init", "--interactive"]) == 0
             
+    except SystemExit:
+        # The tool has already reported why it could not start
+        return False
     except Exception as e:
         print(f"Error running interactive mode: {e}")
         return False
@@ -129,49 +129,71 @@ def main():
     parser.add_argument("--interactive", action="store_true", help="Run interactive command mode")
     parser.add_argument("--all", action="store_true", help="Run full analysis workflow (capture, parse, interactive)")
     parser.add_argument("--duration", type=int, default=120, help="Duration for USB capture in seconds")
-    parser.add_argument("--input-file", help="Input file for parsing (if not using capture)")
+    parser.add_argument("--input-file", nargs="+", help="Input file(s) for parsing (if not using capture)")
     parser.add_argument("--output-dir", help="Directory to save output files")
+    parser.add_argument("--jobs", type=int, default=0, help="Parser processes for multiple input files (0 = auto)")
     
     args = parser.parse_args()
     
+    # Work with paths as Path objects from here on
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    
     # Default to --all if no specific actions selected
     if not (args.capture or args.parse or args.interactive):
         args.all = True
     
-    # Check dependencies
-    if not check_dependencies():
-        return 1
-    
-    # Create output directory if specified
-    if args.output_dir and not os.path.exists(args.output_dir):
-        os.makedirs(args.output_dir)
-    
     # Run the selected actions
     capture_file = None
-    parsed_file = None
+    parsed_files = []
+    do_capture = args.all or args.capture
+    do_parse = args.all or args.parse
+    do_interactive = args.all or args.interactive
     
-    # Capture
-    if args.all or args.capture:
-        capture_file = run_capture(args.duration, args.output_dir)
-        if not capture_file and args.all:
-            print("USB capture failed, but continuing with next steps...")
+    # Parsing alone never touches USB, so skip loading PyUSB for it
+    if (do_capture or do_interactive) and not check_dependencies():
+        return 1
     
-    # Parse
-    if args.all or args.parse:
-        input_file = args.input_file if args.input_file else capture_file
-        if input_file:
-            parsed_file = run_parser(input_file, args.output_dir)
-        else:
-            print("No input file for parsing")
+    # User-supplied input files do not depend on the capture, so parse them
+    # in worker processes while the capture is running
+    parse_executor = None
+    pending_parses = None
+    if (do_capture and do_parse and args.input_file and
+            args.duration >= MIN_CONCURRENT_DURATION):
+        parse_executor = ProcessPoolExecutor(max_workers=parse_workers(args.jobs, len(args.input_file)))
+        pending_parses = [parse_executor.submit(run_parser, input_file, output_dir)
+                          for input_file in args.input_file]
+    
+    try:
+        # Capture
+        if do_capture:
+            capture_file = run_capture(args.duration, output_dir)
+            if not capture_file and args.all:
+                print("USB capture failed, but continuing with next steps...")
+        
+        # Parse
+        if pending_parses:
+            parsed_files = [future.result() for future in pending_parses]
+        elif do_parse:
+            input_files = args.input_file if args.input_file else [capture_file] if capture_file else []
+            if input_files:
+                parsed_files = run_parsers(input_files, output_dir, args.jobs)
+            else:
+                print("No input file for parsing")
+    finally:
+        if parse_executor:
+            parse_executor.shutdown()
     
     # Interactive
-    if args.all or args.interactive:
+    if do_interactive:
         run_interactive_mode()
     
     # Summary
     print("\nAnalysis Summary:")
     print(f"Capture file: {capture_file or 'Not created or specified'}")
-    print(f"Parsed file: {parsed_file or 'Not created'}")
+    if not parsed_files:
+        print("Parsed file: Not created")
+    for parsed_file in parsed_files:
+        print(f"Parsed file: {parsed_file or 'Not created'}")
     
     return 0
 
@@ -18,7 +18,9 @@ setup(
         "pyyaml>=6.0.0",
     ],
     extras_require={
-        "analysis": ["pyshark>=0.5.3"],
+        "analysis": ["pyshark>=0.5.3", "dpkt>=1.9.8"],
+        "capture": ["libusb1>=3.0.0"],
+        "fast": ["numba>=0.58", "orjson>=3.0", "ijson>=3.0"],
     },
     entry_points={
         "console_scripts": [
@@ -11,20 +11,44 @@ based on the reverse-engineered protocols and command sets.
 import os
 import sys
 import time
+import array
+import struct
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
+from functools import partial
+from types import MappingProxyType
 from typing import Optional, List, Dict, Any, Tuple, Union
 
+import numpy as np
+
+# PyUSB is only needed once a USB connection is made, so importing the driver
+# (e.g. to inspect its command tables) works without it
 try:
     import usb.core
     import usb.util
+    PYUSB_AVAILABLE = True
+except ImportError:
+    PYUSB_AVAILABLE = False
+
+# python-libusb1 is optional; when present, raster data is streamed with several
+# bulk transfers queued at once instead of one blocking write at a time
+try:
+    import usb1
+    USB1_AVAILABLE = True
+except ImportError:
+    USB1_AVAILABLE = False
+
+# Numba is optional; with it, unpacked images are thresholded and packed by a
+# compiled kernel instead of np.packbits
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
 except ImportError:
-    logging.error("PyUSB library not found. Please install it using: pip install pyusb")
-    sys.exit(1)
+    NUMBA_AVAILABLE = False
+    prange = range
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('inkcraft_rip')
 
 # Printer models
@@ -53,19 +77,49 @@ class PrintMode(Enum):
 
 # Command constants (from reverse engineering)
 # These will be filled in as we identify the commands through reverse engineering
-COMMANDS = {
-    "INIT": b'\x1b@',  # ESC @ - Initialize printer
-    "GRAPHICS_MODE": b'\x1b(G\x01\x00\x01',  # ESC ( G - Select graphics mode
-    "SET_UNIT": b'\x1b(U\x01\x00\x01',  # ESC ( U - Set unit (1/360 inch)
-    "SET_PAGE_LENGTH": b'\x1b(C\x02\x00',  # ESC ( C - Set page length, needs additional bytes
-    "SET_COLOR": b'\x1b(K\x02\x00',  # ESC ( K - Set color selection, needs additional bytes
-    "SET_INK_DENSITY": b'\x1b(i\x01\x00',  # ESC ( i - Set ink density, needs additional byte
-    "ABSOLUTE_HORIZ_POS": b'\x1b$',  # ESC $ - Set absolute horizontal position
-    "ABSOLUTE_VERT_POS": b'\x1b(V\x02\x00',  # ESC ( V - Set absolute vertical position
-    "BIT_IMAGE": b'\x1b*',  # ESC * - Set bit image mode, needs additional bytes
-    "GRAPHIC_DOT": b'\x1b.',  # ESC . - Graphics dot control
-    # More commands will be added as discovered
-}
+_CMD_INIT = b'\x1b@'  # ESC @ - Initialize printer
+_CMD_GRAPHICS_MODE = b'\x1b(G\x01\x00\x01'  # ESC ( G - Select graphics mode
+_CMD_SET_UNIT = b'\x1b(U\x01\x00\x01'  # ESC ( U - Set unit (1/360 inch)
+_CMD_SET_PAGE_LENGTH = b'\x1b(C\x02\x00'  # ESC ( C - Set page length, needs additional bytes
+_CMD_SET_COLOR = b'\x1b(K\x02\x00'  # ESC ( K - Set color selection, needs additional bytes
+_CMD_SET_INK_DENSITY = b'\x1b(i\x01\x00'  # ESC ( i - Set ink density, needs additional byte
+_CMD_ABSOLUTE_HORIZ_POS = b'\x1b$'  # ESC $ - Set absolute horizontal position
+_CMD_ABSOLUTE_VERT_POS = b'\x1b(V\x02\x00'  # ESC ( V - Set absolute vertical position
+_CMD_BIT_IMAGE = b'\x1b*'  # ESC * - Set bit image mode, needs additional bytes
+_CMD_GRAPHIC_DOT = b'\x1b.'  # ESC . - Graphics dot control
+# More commands will be added as discovered
+
+# Read-only view by name, for inspection; driver code uses the constants above
+COMMANDS = MappingProxyType({
+    "INIT": _CMD_INIT,
+    "GRAPHICS_MODE": _CMD_GRAPHICS_MODE,
+    "SET_UNIT": _CMD_SET_UNIT,
+    "SET_PAGE_LENGTH": _CMD_SET_PAGE_LENGTH,
+    "SET_COLOR": _CMD_SET_COLOR,
+    "SET_INK_DENSITY": _CMD_SET_INK_DENSITY,
+    "ABSOLUTE_HORIZ_POS": _CMD_ABSOLUTE_HORIZ_POS,
+    "ABSOLUTE_VERT_POS": _CMD_ABSOLUTE_VERT_POS,
+    "BIT_IMAGE": _CMD_BIT_IMAGE,
+    "GRAPHIC_DOT": _CMD_GRAPHIC_DOT,
+})
+
+def _command_template(prefix: bytes, args_format: str):
+    """Return a packer producing prefix followed by little-endian arguments"""
+    return partial(struct.Struct(f"<{len(prefix)}s{args_format}").pack, prefix)
+
+# Parameterized commands, each packed with a single struct call
+PACK_COLOR = _command_template(_CMD_SET_COLOR, "2B")  # ESC ( K 2 0 0 c
+PACK_PAGE_LENGTH = _command_template(_CMD_SET_PAGE_LENGTH, "H")  # ESC ( C 2 0 nL nH
+PACK_RASTER_HEADER = _command_template(_CMD_GRAPHIC_DOT, "4BH")  # ESC . c v h m nL nH
+
+# ESC $ nL nH followed by ESC ( V 2 0 nL nH, set together in one sequence
+_HORIZ_POS = _CMD_ABSOLUTE_HORIZ_POS
+_VERT_POS = _CMD_ABSOLUTE_VERT_POS
+_POSITION = struct.Struct(f"<{len(_HORIZ_POS)}sH{len(_VERT_POS)}sH")
+
+def pack_position(x: int, y: int) -> bytes:
+    """Return the absolute X and Y position commands, packed in a single call"""
+    return _POSITION.pack(_HORIZ_POS, x & 0xFFFF, _VERT_POS, y & 0xFFFF)
 
 # Epson F2100/F2130 USB identifiers
 EPSON_VENDOR_ID = 0x04b8  # Epson vendor ID
@@ -73,6 +127,90 @@ PRODUCT_IDS = {
     PrinterModel.F2100: 0x0883,  # Needs verification
     PrinterModel.F2130: 0x0884,  # Needs verification
 }
+MODELS_BY_PRODUCT_ID = {product_id: model for model, product_id in PRODUCT_IDS.items()}
+
+# Readiness poll after ESC @; the status query is not confirmed on hardware, so
+# support is detected from whether the printer answers it at all (see
+# EpsonDTGDriver._wait_until_ready), falling back to a fixed delay
+STATUS_QUERY = b'\x1b\x06\x01'  # Needs verification
+STATUS_READY = 0x00  # Needs verification
+READY_BUDGET = 0.5  # Seconds to wait for the printer after initializing
+READY_POLL_TIMEOUT = 50  # Milliseconds per status read
+
+# Preallocated command buffer; commands larger than this are written on their own
+TX_BUFFER_SIZE = 64 * 1024
+
+# Raster streaming
+RASTER_CHUNK_SIZE = 2 * 1024 * 1024  # Bytes per bulk OUT transfer
+RASTER_TRANSFERS = 4  # Bulk OUT transfers kept in flight when streaming asynchronously
+RASTER_TIMEOUT = 5000  # Milliseconds per raster transfer
+# Rows framed by one ESC . block; a multiple of 10, so a block's height in
+# 1/3600 inch dots is a whole number of 1/360 inch position units
+RASTER_BLOCK_ROWS = 40
+
+def _rle_scanline(row: bytes) -> bytes:
+    """
+    Run-length encode one raster row in the ESC/P2 (TIFF PackBits) scheme
+    
+    A counter byte n of 0-127 is followed by n + 1 literal bytes; a counter of
+    129-255 is followed by one byte that repeats 257 - n times.
+    
+    Args:
+        row: Packed row data
+        
+    Returns:
+        bytes: Encoded row
+    """
+    values = np.frombuffer(row, dtype=np.uint8)
+    if not len(values):
+        return b''
+        
+    # Start offset of every run of identical bytes
+    starts = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], starts, [len(values)])).tolist()
+    
+    out = bytearray()
+    literal_start = 0
+    
+    def emit_literals(end):
+        for chunk in range(literal_start, end, 128):
+            chunk_end = min(chunk + 128, end)
+            out.append(chunk_end - chunk - 1)
+            out.extend(row[chunk:chunk_end])
+    
+    for start, end in zip(starts, starts[1:]):
+        length = end - start
+        if length < 3:
+            # Too short to be worth a repeat; leave it in the literal stretch
+            continue
+            
+        emit_literals(start)
+        while length >= 2:
+            count = min(length, 128)
+            out.append(257 - count)
+            out.append(row[start])
+            length -= count
+        literal_start = end - length
+        
+    emit_literals(len(values))
+    return bytes(out)
+
+def _threshold_pack(image, threshold, out):
+    """
+    Pack a (height, width) array of ink values into bits, 1 where above threshold
+    
+    Dots are written MSB first into out, a zeroed (height, (width + 7) // 8)
+    uint8 array; the result matches np.packbits(image > threshold, axis=1).
+    Rows are independent, so they are packed in parallel when compiled.
+    """
+    height, width = image.shape
+    for y in prange(height):
+        for x in range(width):
+            if image[y, x] > threshold:
+                out[y, x >> 3] |= 0x80 >> (x & 7)
+
+if NUMBA_AVAILABLE:
+    _threshold_pack = njit(parallel=True, cache=True)(_threshold_pack)
 
 class EpsonDTGDriver:
     """
@@ -101,18 +239,32 @@ class EpsonDTGDriver:
         self.interface = None
         self.endpoint_in = None
         self.endpoint_out = None
+        self._ep_in_addr = None  # Endpoint attributes as plain ints for the I/O paths
+        self._ep_in_mps = None
+        self._ep_out_addr = None
+        self._ep_out_mps = None
+        self._rx_buffer = None  # Reused for every IN transfer
+        self._tx_buffer = bytearray(TX_BUFFER_SIZE)  # Commands waiting to go out in one bulk write
+        self._tx_length = 0  # Bytes of _tx_buffer in use
+        self._usb1_context = None  # libusb1 session used for asynchronous raster streaming
+        self._usb1_handle = None
+        self._io_executor = None  # Single worker thread behind the async API
+        self._status_query_supported = None  # Whether the printer answers STATUS_QUERY; None until tried
         
         # Current state
         self.is_connected = False
         self.is_initialized = False
         self.current_position = (0, 0)  # (x, y) position in dots
         self.current_color = InkChannel.BLACK
+        self._sent_position = None  # Last position/color sent since the printer was reset
+        self._sent_color = None
         self.current_mode = PrintMode.STANDARD
         
         # Print job information
         self.print_width = 0
         self.print_height = 0
         self.resolution = (720, 720)  # (x, y) resolution in dpi
+        self.threshold = 127  # Unpacked image values above this are printed
         
         # Command logging for debugging
         self.command_log = []
@@ -142,7 +294,7 @@ class EpsonDTGDriver:
         elif self.connection_type == ConnectionType.NETWORK:
             return self._connect_network()
         else:
-            logger.error(f"Unsupported connection type: {self.connection_type}")
+            logger.error("Unsupported connection type: %s", self.connection_type)
             return False
     
     def _connect_usb(self) -> bool:
@@ -152,27 +304,28 @@ class EpsonDTGDriver:
         Returns:
             bool: True if connection successful, False otherwise
         """
+        if not PYUSB_AVAILABLE:
+            logger.error("PyUSB library not found. Please install it using: pip install pyusb")
+            return False
+            
         try:
-            # If model is specified, use its product ID
-            if self.model and self.model in PRODUCT_IDS:
-                product_id = PRODUCT_IDS[self.model]
-                self.device = usb.core.find(idVendor=EPSON_VENDOR_ID, idProduct=product_id)
-                
-                if self.device:
-                    logger.info(f"Found {self.model.name} printer with VID:PID = {EPSON_VENDOR_ID:04x}:{product_id:04x}")
-                
-            # If model is not specified or not found, try all known product IDs
-            if not self.device:
-                for model, product_id in PRODUCT_IDS.items():
-                    self.device = usb.core.find(idVendor=EPSON_VENDOR_ID, idProduct=product_id)
-                    if self.device:
-                        self.model = model
-                        logger.info(f"Found {model.name} printer with VID:PID = {EPSON_VENDOR_ID:04x}:{product_id:04x}")
-                        break
+            # Enumerate the bus once and pick from every known DTG printer on it,
+            # preferring the requested model
+            devices = list(usb.core.find(find_all=True, idVendor=EPSON_VENDOR_ID,
+                                         custom_match=lambda d: d.idProduct in MODELS_BY_PRODUCT_ID))
+            for device in devices:
+                if MODELS_BY_PRODUCT_ID[device.idProduct] == self.model:
+                    self.device = device
+                    break
+            else:
+                self.device = devices[0] if devices else None
             
             if not self.device:
                 logger.error("No Epson DTG printer found. Is it connected and powered on?")
                 return False
+                
+            self.model = MODELS_BY_PRODUCT_ID[self.device.idProduct]
+            logger.info("Found %s printer with VID:PID = %04x:%04x", self.model.name, EPSON_VENDOR_ID, self.device.idProduct)
             
             # Detach kernel driver if active
             if self.device.is_kernel_driver_active(0):
@@ -180,7 +333,7 @@ class EpsonDTGDriver:
                     self.device.detach_kernel_driver(0)
                     logger.debug("Kernel driver detached")
                 except Exception as e:
-                    logger.warning(f"Could not detach kernel driver: {e}")
+                    logger.warning("Could not detach kernel driver: %s", e)
             
             # Set configuration
             self.device.set_configuration()
@@ -194,21 +347,30 @@ class EpsonDTGDriver:
                 ep_addr = ep.bEndpointAddress
                 if usb.util.endpoint_direction(ep_addr) == usb.util.ENDPOINT_IN:
                     self.endpoint_in = ep
-                    logger.debug(f"Found IN endpoint: {ep_addr:02x}")
+                    logger.debug("Found IN endpoint: %02x", ep_addr)
                 else:
                     self.endpoint_out = ep
-                    logger.debug(f"Found OUT endpoint: {ep_addr:02x}")
+                    logger.debug("Found OUT endpoint: %02x", ep_addr)
             
             if not self.endpoint_in or not self.endpoint_out:
                 logger.error("Could not find required endpoints")
                 return False
             
+            self._ep_in_addr = int(self.endpoint_in.bEndpointAddress)
+            self._ep_in_mps = int(self.endpoint_in.wMaxPacketSize)
+            self._ep_out_addr = int(self.endpoint_out.bEndpointAddress)
+            self._ep_out_mps = int(self.endpoint_out.wMaxPacketSize)
+            
+            # Allocate the read buffer once so responses don't need a fresh array per transfer
+            self._rx_buffer = usb.util.create_buffer(self._ep_in_mps)
+            self._status_query_supported = None
+            
             self.is_connected = True
             logger.info("Successfully connected to printer")
             return True
             
         except Exception as e:
-            logger.error(f"Error connecting to printer: {e}")
+            logger.error("Error connecting to printer: %s", e)
             return False
     
     def _connect_network(self) -> bool:
@@ -234,6 +396,13 @@ class EpsonDTGDriver:
             return True
             
         try:
+            # Finish queued async calls, then don't drop commands that are still buffered
+            if self._io_executor:
+                self._io_executor.shutdown()
+                self._io_executor = None
+            self.flush()
+            self._close_async_handle()
+            
             if self.device and self.interface:
                 usb.util.release_interface(self.device, self.interface.bInterfaceNumber)
                 
@@ -247,14 +416,20 @@ class EpsonDTGDriver:
             self.interface = None
             self.endpoint_in = None
             self.endpoint_out = None
+            self._ep_in_addr = self._ep_in_mps = None
+            self._ep_out_addr = self._ep_out_mps = None
+            self._rx_buffer = None
+            self._tx_length = 0
             self.is_connected = False
             self.is_initialized = False
+            self._sent_position = None
+            self._sent_color = None
             
             logger.info("Disconnected from printer")
             return True
             
         except Exception as e:
-            logger.error(f"Error disconnecting from printer: {e}")
+            logger.error("Error disconnecting from printer: %s", e)
             return False
     
     def initialize(self) -> bool:
@@ -274,44 +449,95 @@ class EpsonDTGDriver:
             
         try:
             # Send initialize command
-            if not self._send_command(COMMANDS["INIT"]):
+            if not self._send_command(_CMD_INIT, flush=True):
                 logger.error("Failed to initialize printer")
                 return False
                 
             # Give the printer some time to initialize
-            time.sleep(0.5)
+            self._wait_until_ready()
             
-            # Enter graphics mode
-            if not self._send_command(COMMANDS["GRAPHICS_MODE"]):
+            # Enter graphics mode (sent together with the unit below)
+            if not self._send_command(_CMD_GRAPHICS_MODE):
                 logger.error("Failed to enter graphics mode")
                 return False
                 
             # Set unit (1/360 inch)
-            if not self._send_command(COMMANDS["SET_UNIT"]):
+            if not self._send_command(_CMD_SET_UNIT, flush=True):
                 logger.error("Failed to set unit")
                 return False
             
             self.is_initialized = True
-            self.current_position = (0, 0)
+            self.reset_state()
             logger.info("Printer initialized successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error initializing printer: {e}")
+            logger.error("Error initializing printer: %s", e)
+            return False
+    
+    def _wait_until_ready(self, budget: float = READY_BUDGET) -> bool:
+        """
+        Wait for the printer to come ready after a reset
+        
+        Polls the status query until the ready byte arrives or the budget runs
+        out, at most once per READY_POLL_TIMEOUT. Any reply shows the printer
+        supports the query; if the whole budget passes without one, it is taken
+        as unsupported and later waits just sleep for the budget.
+        
+        Args:
+            budget: Maximum time to wait in seconds
+            
+        Returns:
+            bool: True if the printer reported ready, False if the budget ran out
+        """
+        deadline = time.monotonic() + budget
+        if self._status_query_supported is False or not self.endpoint_in:
+            time.sleep(budget)
             return False
+            
+        while True:
+            poll_end = time.monotonic() + READY_POLL_TIMEOUT / 1000
+            if poll_end > deadline:
+                if self._status_query_supported is None:
+                    logger.debug("No reply to the status query; waiting a fixed %ss after reset from now on", budget)
+                    self._status_query_supported = False
+                else:
+                    logger.debug("Printer did not report ready within %ss", budget)
+                break
+            if not self._send_command(STATUS_QUERY, flush=True):
+                break
+            response = self._read_response(timeout=READY_POLL_TIMEOUT, max_reads=1)
+            if response:
+                self._status_query_supported = True
+                if STATUS_READY in response:
+                    return True
+            # A read that fails at once must not turn this into a busy loop
+            time.sleep(max(0.0, poll_end - time.monotonic()))
+            
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        return False
     
-    def _send_command(self, command: bytes, read_response: bool = True, 
-                     response_timeout: int = 1000) -> bool:
+    def _send_command(self, command: bytes, read_response: bool = False, 
+                     response_timeout: int = 1000, flush: bool = False) -> bool:
         """
         Send a raw command to the printer
         
+        Commands are buffered and written together, so several short commands
+        share one bulk transfer. The buffer is written out when a response is
+        wanted, when it reaches the OUT endpoint's packet size, or when flush
+        is set.
+        
+        ESC/P state-setting commands don't answer, so responses are only read
+        when asked for; waiting on one would just run out the timeout.
+        
         Args:
             command: Command bytes to send
-            read_response: Whether to read a response
+            read_response: Whether to read a response (only for commands that reply)
             response_timeout: Timeout for response in milliseconds
+            flush: Write the buffer out even if no response is read
             
         Returns:
-            bool: True if command sent successfully, False otherwise
+            bool: True if command sent (or queued) successfully, False otherwise
         """
         if not self.is_connected or not self.endpoint_out:
             logger.error("Not connected to printer")
@@ -319,80 +545,137 @@ class EpsonDTGDriver:
             
         try:
             # Log command if debug enabled
-            if self.debug_level > 0:
-                cmd_hex = ' '.join([f"{b:02x}" for b in command])
-                logger.debug(f"Sending: {cmd_hex}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending: %s", command.hex(' '))
             
-            # Send the command
-            bytes_written = self.device.write(self.endpoint_out.bEndpointAddress, command)
+            # Make room first if the command doesn't fit behind what is queued
+            end = self._tx_length + len(command)
+            if end > TX_BUFFER_SIZE:
+                if not self.flush():
+                    return False
+                end = len(command)
+            
+            if end > TX_BUFFER_SIZE:
+                # Too big to buffer at all; send it on its own
+                if self.device.write(self._ep_out_addr, command) <= 0:
+                    return False
+            else:
+                self._tx_buffer[self._tx_length:end] = command
+                self._tx_length = end
+                
+                if not (read_response or flush or end >= self._ep_out_mps):
+                    return True
+                
+                # Send the buffered commands
+                if not self.flush():
+                    return False
             
             # Read response if requested
             if read_response:
                 response = self._read_response(timeout=response_timeout)
                 
+            return True
+            
+        except Exception as e:
+            logger.error("Error sending command: %s", e)
+            return False
+    
+    def flush(self) -> bool:
+        """
+        Write any buffered commands to the printer
+        
+        Returns:
+            bool: True if the buffer was written (or was empty), False otherwise
+        """
+        if not self._tx_length:
+            return True
+            
+        if not self.is_connected or not self.endpoint_out:
+            logger.error("Not connected to printer")
+            return False
+            
+        try:
+            bytes_written = self.device.write(self._ep_out_addr, self._tx_buffer[:self._tx_length])
             return bytes_written > 0
             
         except Exception as e:
-            logger.error(f"Error sending command: {e}")
+            logger.error("Error sending command: %s", e)
             return False
+            
+        finally:
+            # Never resend a batch, whether or not it went out
+            self._tx_length = 0
     
-    def _read_response(self, timeout: int = 1000, max_reads: int = 5) -> List[bytes]:
+    def _read_response(self, timeout: int = 1000, max_reads: int = 5) -> bytes:
         """
         Read response from the printer
         
+        A transfer ends with a short packet, so a typical one-packet status reply
+        costs a single read; only full packets are followed by another (short
+        timeout) read for the rest.
+        
         Args:
-            timeout: Read timeout in milliseconds
-            max_reads: Maximum number of read attempts
+            timeout: Read timeout in milliseconds for the first packet
+            max_reads: Maximum number of packets to read
             
         Returns:
-            List of response data chunks
+            Response data (empty if the printer sent nothing)
         """
         if not self.is_connected or not self.endpoint_in:
             logger.error("Not connected to printer")
-            return []
+            return b''
             
-        responses = []
+        response = bytearray()
+        rx_view = memoryview(self._rx_buffer)
         
         try:
-            # Try reading multiple times if needed
             for _ in range(max_reads):
                 try:
-                    response = self.device.read(
-                        self.endpoint_in.bEndpointAddress,
-                        self.endpoint_in.wMaxPacketSize,
-                        timeout=timeout
-                    )
+                    count = self.device.read(self._ep_in_addr, self._rx_buffer, timeout=timeout)
+                except usb.core.USBTimeoutError:
+                    # Nothing (more) to read
+                    break
                     
-                    if response:
-                        if self.debug_level > 0:
-                            resp_hex = ' '.join([f"{b:02x}" for b in response])
-                            logger.debug(f"Response: {resp_hex}")
-                        
-                        responses.append(response)
-                        
-                        # Short timeout for additional data
-                        timeout = 100
-                        
-                except usb.core.USBError as e:
-                    # Timeout is normal after getting all data
-                    if e.args[0] == 'Operation timed out':
-                        break
-                    logger.error(f"USB Error: {e}")
+                response += rx_view[:count]
+                if count < self._ep_in_mps:
                     break
-            
-            return responses
+                    
+                # A full packet means more data may follow straight away
+                timeout = 10
                 
+        except usb.core.USBError as e:
+            logger.error("USB Error: %s", e)
+            
         except Exception as e:
-            logger.error(f"Error reading response: {e}")
-            return []
+            logger.error("Error reading response: %s", e)
+            return b''
+            
+        if response and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response: %s", response.hex(' '))
+            
+        return bytes(response)
+    
+    def reset_state(self) -> None:
+        """
+        Forget the cached head position and color
+        
+        set_position and set_color skip commands that would not change the
+        printer's state, so call this after changing that state by other means
+        (e.g. raw commands) to make the next calls send again.
+        """
+        self.current_position = (0, 0)
+        self._sent_position = None
+        self._sent_color = None
     
-    def set_position(self, x: int, y: int) -> bool:
+    def set_position(self, x: int, y: int = None) -> bool:
         """
         Set the absolute position of the print head
         
+        Nothing is sent if the head is already there.
+        
         Args:
             x: X position in dots (1/360 inch)
-            y: Y position in dots (1/360 inch)
+            y: Y position in dots (1/360 inch), or None to keep the current one
             
         Returns:
             bool: True if position set successfully, False otherwise
@@ -401,30 +684,31 @@ class EpsonDTGDriver:
             logger.error("Printer not initialized")
             return False
             
+        if y is None:
+            y = self.current_position[1]
+        if self._sent_position == (x, y):
+            return True
+            
         try:
-            # Set X position (ESC $ nL nH)
-            x_cmd = COMMANDS["ABSOLUTE_HORIZ_POS"] + bytes([x & 0xFF, (x >> 8) & 0xFF])
-            if not self._send_command(x_cmd):
-                logger.error("Failed to set horizontal position")
-                return False
-                
-            # Set Y position (ESC ( V 2 0 nL nH)
-            y_cmd = COMMANDS["ABSOLUTE_VERT_POS"] + bytes([y & 0xFF, (y >> 8) & 0xFF])
-            if not self._send_command(y_cmd):
-                logger.error("Failed to set vertical position")
+            # Set X and Y position together (ESC $ nL nH, ESC ( V 2 0 nL nH)
+            pos_cmd = pack_position(x, y)
+            if not self._send_command(pos_cmd):
+                logger.error("Failed to set position")
                 return False
                 
-            self.current_position = (x, y)
+            self.current_position = self._sent_position = (x, y)
             return True
             
         except Exception as e:
-            logger.error(f"Error setting position: {e}")
+            logger.error("Error setting position: %s", e)
             return False
     
     def set_color(self, color: InkChannel) -> bool:
         """
         Set the active color for printing
         
+        Nothing is sent if the color is already selected.
+        
         Args:
             color: Ink channel to use
             
@@ -435,18 +719,21 @@ class EpsonDTGDriver:
             logger.error("Printer not initialized")
             return False
             
+        if self._sent_color is color:
+            return True
+            
         try:
             # Set color (ESC ( K 2 0 0 c) where c is the color index
-            color_cmd = COMMANDS["SET_COLOR"] + bytes([0x00, color.value])
+            color_cmd = PACK_COLOR(0x00, color.value)
             if not self._send_command(color_cmd):
-                logger.error(f"Failed to set color to {color.name}")
+                logger.error("Failed to set color to %s", color.name)
                 return False
                 
-            self.current_color = color
+            self.current_color = self._sent_color = color
             return True
             
         except Exception as e:
-            logger.error(f"Error setting color: {e}")
+            logger.error("Error setting color: %s", e)
             return False
     
     def set_print_mode(self, mode: PrintMode) -> bool:
@@ -467,20 +754,22 @@ class EpsonDTGDriver:
             # Set print mode - exact command will be determined through reverse engineering
             # For now, just update the state
             self.current_mode = mode
-            logger.info(f"Set print mode to {mode.name}")
+            logger.info("Set print mode to %s", mode.name)
             return True
             
         except Exception as e:
-            logger.error(f"Error setting print mode: {e}")
+            logger.error("Error setting print mode: %s", e)
             return False
     
-    def send_image_data(self, data: bytes, width: int, height: int, 
+    def send_image_data(self, data: Union[bytes, np.ndarray], width: int, height: int, 
                        x: int = None, y: int = None, color: InkChannel = None) -> bool:
         """
         Send image data to the printer
         
         Args:
-            data: Raster image data (packed bits)
+            data: Raster image data, either packed bits (rows padded to whole bytes)
+                  or a (height, width) array of ink values 0-255, which is
+                  thresholded against self.threshold and packed here
             width: Width of image in dots
             height: Height of image in dots
             x: X position (or use current position if None)
@@ -505,19 +794,289 @@ class EpsonDTGDriver:
                 if not self.set_color(color):
                     return False
             
-            # Send image data - exact implementation will depend on reverse engineering
-            # This is a placeholder for the actual implementation
-            logger.info(f"Sending {len(data)} bytes of image data ({width}x{height})")
+            if isinstance(data, np.ndarray):
+                if data.shape != (height, width):
+                    logger.error("Image array shape %s does not match %sx%s", data.shape, width, height)
+                    return False
+                # Threshold and pack 8 dots per byte, MSB first
+                if NUMBA_AVAILABLE:
+                    packed = np.zeros((height, (width + 7) // 8), dtype=np.uint8)
+                    _threshold_pack(data, self.threshold, packed)
+                else:
+                    packed = np.packbits(data > self.threshold, axis=1)
+                # Use the packed array's memory directly
+                data = memoryview(packed.reshape(-1))
             
-            # TODO: Implement the actual image data sending logic
-            # This will involve breaking the image into chunks and using the appropriate ESC/P commands
+            row_bytes = (width + 7) // 8
+            if len(data) != row_bytes * height:
+                logger.error("Image data is %s bytes, expected %s for %sx%s", len(data), row_bytes * height, width, height)
+                return False
             
-            return True
+            logger.info("Sending %s bytes of image data (%sx%s)", len(data), width, height)
+            
+            # Send everything queued so far before the raster, then stream it
+            if not self.flush():
+                return False
+                
+            origin = self.current_position
+            try:
+                return self._write_raster(data, width, height, origin)
+            finally:
+                # The raster leaves the head at the end of its last block (ESC .
+                # moves the horizontal position past each block, h/3600 inch per
+                # dot), not where set_position put it, even after a partial
+                # write; so the next set_position must be sent even for the
+                # same origin
+                last_block = (height - 1) // RASTER_BLOCK_ROWS * RASTER_BLOCK_ROWS
+                self.current_position = (origin[0] + width * (3600 // self.resolution[0]) // 10,
+                                         origin[1] + last_block * (3600 // self.resolution[1]) // 10)
+                self._sent_position = None
             
         except Exception as e:
-            logger.error(f"Error sending image data: {e}")
+            logger.error("Error sending image data: %s", e)
             return False
     
+    def _build_band(self, band: bytearray, data: Union[bytes, memoryview], row: int,
+                    width: int, height: int, origin: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Frame packed image rows as ESC/P2 raster graphics, filling band in place
+        
+        Rows go out in blocks of up to RASTER_BLOCK_ROWS, each ESC . c v h m nL nH
+        followed by its m rows, with v/h = dot size in 1/3600 inch. The printer
+        stacks a block's rows itself, but ESC . neither moves down nor returns
+        to the left edge afterwards, so every block after the first is preceded
+        by an absolute position at the origin x and the y of its first row.
+        Blocks are run-length encoded (c = 1, each row encoded on its own) when
+        that makes them smaller and sent raw (c = 0) otherwise.
+        The exact framing the DTG firmware expects still needs verification.
+        
+        Args:
+            band: Buffer to write into, from offset 0
+            data: Raster image data (packed bits, rows padded to whole bytes)
+            row: First row to frame; a multiple of RASTER_BLOCK_ROWS
+            width: Width of image in dots
+            height: Height of image in dots
+            origin: (x, y) position of the image's first row, in 1/360 inch
+            
+        Returns:
+            Tuple of (bytes written to band, first row that did not fit)
+        """
+        rows = memoryview(data)
+        row_bytes = (width + 7) // 8
+        v, h = 3600 // self.resolution[1], 3600 // self.resolution[0]
+        band_size = len(band)
+        
+        length = 0
+        while row < height:
+            count = min(RASTER_BLOCK_ROWS, height - row)
+            block = rows[row * row_bytes:(row + count) * row_bytes]
+            compressed = b''.join([_rle_scanline(block[i:i + row_bytes])
+                                   for i in range(0, len(block), row_bytes)])
+            if len(compressed) < len(block):
+                header, payload = PACK_RASTER_HEADER(0x01, v, h, count, width & 0xFFFF), compressed
+            else:
+                header, payload = PACK_RASTER_HEADER(0x00, v, h, count, width & 0xFFFF), block
+            if row:
+                header = pack_position(origin[0], origin[1] + row * v // 10) + header
+                
+            body = length + len(header)
+            end = body + len(payload)
+            if end > band_size:
+                if not length:
+                    raise ValueError(f"{count} rows of {width} dots do not fit in one raster band")
+                break
+            band[length:body] = header
+            band[body:end] = payload
+            length = end
+            row += count
+        return length, row
+    
+    def _write_raster(self, data: Union[bytes, memoryview], width: int, height: int,
+                      origin: Tuple[int, int]) -> bool:
+        """
+        Frame and write packed image rows in bands of up to RASTER_CHUNK_SIZE
+        
+        Each band is built straight into a preallocated buffer and sent as one
+        bulk transfer. Uses queued asynchronous transfers when python-libusb1
+        can open the device, otherwise blocking PyUSB writes.
+        
+        Args:
+            data: Raster image data (packed bits, rows padded to whole bytes)
+            width: Width of image in dots
+            height: Height of image in dots
+            origin: (x, y) position of the image's first row, in 1/360 inch
+            
+        Returns:
+            bool: True if all data was sent, False otherwise
+        """
+        if USB1_AVAILABLE and self._open_async_handle():
+            return self._write_raster_async(data, width, height, origin)
+            
+        address = self._ep_out_addr
+        band = bytearray(RASTER_CHUNK_SIZE)
+        view = memoryview(band)
+        row = 0
+        while row < height:
+            length, row = self._build_band(band, data, row, width, height, origin)
+            # PyUSB passes array('B') through as is; anything else it converts,
+            # and a memoryview would be converted byte by byte
+            chunk = array.array('B')
+            chunk.frombytes(view[:length])
+            if self.device.write(address, chunk, timeout=RASTER_TIMEOUT) != length:
+                logger.error("Short write while sending image data")
+                return False
+        return True
+    
+    def _open_async_handle(self) -> bool:
+        """
+        Open the connected printer through python-libusb1 (once per connection)
+        
+        Returns:
+            bool: True if the libusb1 handle is ready, False otherwise
+        """
+        if self._usb1_handle:
+            return True
+            
+        try:
+            self._usb1_context = usb1.USBContext().open()
+            for dev in self._usb1_context.getDeviceIterator(skip_on_error=True):
+                if (dev.getBusNumber() == self.device.bus and
+                        dev.getDeviceAddress() == self.device.address):
+                    self._usb1_handle = dev.open()
+                    return True
+        except (usb1.USBError, OSError) as e:
+            # OSError: libusb-1.0 itself could not be loaded
+            logger.debug("Asynchronous transfers unavailable: %s", e)
+            
+        self._close_async_handle()
+        return False
+    
+    def _close_async_handle(self) -> None:
+        """Close the python-libusb1 handle and session, if open"""
+        if self._usb1_handle:
+            self._usb1_handle.close()
+            self._usb1_handle = None
+        if self._usb1_context:
+            self._usb1_context.close()
+            self._usb1_context = None
+    
+    def _write_raster_async(self, data: Union[bytes, memoryview], width: int, height: int,
+                            origin: Tuple[int, int]) -> bool:
+        """
+        Stream raster bands with RASTER_TRANSFERS bulk OUT transfers in flight
+        
+        Each transfer owns one band buffer. When a transfer completes, its band
+        is refilled with the next rows and resubmitted, so the bus never waits
+        on Python between bands. libusb completes transfers on an endpoint in
+        submission order, so the data arrives in order.
+        
+        Args:
+            data: Raster image data (packed bits, rows padded to whole bytes)
+            width: Width of image in dots
+            height: Height of image in dots
+            origin: (x, y) position of the image's first row, in 1/360 inch
+            
+        Returns:
+            bool: True if all data was sent, False otherwise
+        """
+        next_row = 0
+        failed = False
+        interface_number = self.interface.bInterfaceNumber
+        
+        def fill(transfer, band):
+            # Load the next band into the transfer; False once the image is done
+            nonlocal next_row
+            length, next_row = self._build_band(band, data, next_row, width, height, origin)
+            if not length:
+                return False
+            # Writable views are used by libusb1 in place
+            transfer.setBuffer(memoryview(band)[:length])
+            transfer.setUserData((band, length))
+            return True
+        
+        def on_complete(transfer):
+            nonlocal failed
+            band, length = transfer.getUserData()
+            if (transfer.getStatus() != usb1.TRANSFER_COMPLETED or
+                    transfer.getActualLength() != length):
+                logger.error("Raster transfer failed with status %s", transfer.getStatus())
+                failed = True
+            elif not failed and fill(transfer, band):
+                transfer.submit()
+        
+        # PyUSB holds the interface claim; hand it over for the duration of the stream
+        usb.util.release_interface(self.device, interface_number)
+        self._usb1_handle.claimInterface(interface_number)
+        transfers = []
+        try:
+            for _ in range(RASTER_TRANSFERS):
+                band = bytearray(RASTER_CHUNK_SIZE)
+                transfer = self._usb1_handle.getTransfer()
+                transfer.setBulk(self._ep_out_addr, band,
+                                 callback=on_complete, timeout=RASTER_TIMEOUT)
+                transfers.append(transfer)
+                if not fill(transfer, band):
+                    break
+                transfer.submit()
+            
+            while any(t.isSubmitted() for t in transfers):
+                self._usb1_context.handleEventsTimeout(RASTER_TIMEOUT / 1000)
+                
+        except usb1.USBError as e:
+            logger.error("Error streaming image data: %s", e)
+            failed = True
+                
+        finally:
+            # Cancel whatever is still queued and wait for it before freeing the transfers
+            failed = failed or next_row < height
+            for transfer in transfers:
+                if transfer.isSubmitted():
+                    try:
+                        transfer.cancel()
+                    except usb1.USBError:
+                        pass
+            while any(t.isSubmitted() for t in transfers):
+                self._usb1_context.handleEventsTimeout(0.1)
+                
+            for transfer in transfers:
+                transfer.close()
+            self._usb1_handle.releaseInterface(interface_number)
+            
+        return not failed
+    
+    def _run_in_io_thread(self, func, *args, **kwargs) -> asyncio.Future:
+        """
+        Run a blocking driver call on the I/O thread and return an awaitable
+        
+        All async calls share one worker thread, so they reach the printer one
+        at a time and in the order they were made.
+        """
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inkcraft-usb")
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self._io_executor, partial(func, *args, **kwargs))
+    
+    async def send_image_data_async(self, data: Union[bytes, np.ndarray], width: int, height: int,
+                                    x: int = None, y: int = None, color: InkChannel = None) -> bool:
+        """
+        Asynchronous send_image_data for callers running an event loop
+        
+        Packing and transfer happen on the driver's I/O thread, so the loop
+        keeps running (e.g. preparing the next image) while the raster streams.
+        Takes the same arguments as send_image_data.
+        """
+        return await self._run_in_io_thread(self.send_image_data, data, width, height,
+                                            x=x, y=y, color=color)
+    
+    async def end_print_job_async(self) -> bool:
+        """
+        Asynchronous end_print_job; completes after all earlier async sends
+        
+        Returns:
+            bool: True if job ended successfully, False otherwise
+        """
+        return await self._run_in_io_thread(self.end_print_job)
+    
     def start_print_job(self, width: int, height: int) -> bool:
         """
         Start a new print job
@@ -538,16 +1097,16 @@ class EpsonDTGDriver:
             self.print_height = height
             
             # Set page length (ESC ( C 2 0 nL nH)
-            page_cmd = COMMANDS["SET_PAGE_LENGTH"] + bytes([height & 0xFF, (height >> 8) & 0xFF])
+            page_cmd = PACK_PAGE_LENGTH(height & 0xFFFF)
             if not self._send_command(page_cmd):
                 logger.error("Failed to set page length")
                 return False
             
-            logger.info(f"Started print job ({width}x{height})")
+            logger.info("Started print job (%sx%s)", width, height)
             return True
             
         except Exception as e:
-            logger.error(f"Error starting print job: {e}")
+            logger.error("Error starting print job: %s", e)
             return False
     
     def end_print_job(self) -> bool:
@@ -563,16 +1122,16 @@ class EpsonDTGDriver:
             
         try:
             # Reset to initial state
-            if not self._send_command(COMMANDS["INIT"]):
+            if not self._send_command(_CMD_INIT, flush=True):
                 logger.error("Failed to reset printer state")
                 return False
                 
             logger.info("Ended print job")
-            self.current_position = (0, 0)
+            self.reset_state()
             return True
             
         except Exception as e:
-            logger.error(f"Error ending print job: {e}")
+            logger.error("Error ending print job: %s", e)
             return False
     
     def get_printer_info(self) -> Dict[str, Any]:
@@ -602,13 +1161,17 @@ class EpsonDTGDriver:
                 info["vendor_id"] = f"0x{self.device.idVendor:04x}"
                 info["product_id"] = f"0x{self.device.idProduct:04x}"
             except Exception as e:
-                logger.error(f"Error getting printer info: {e}")
+                logger.error("Error getting printer info: %s", e)
         
         return info
 
 
 # Example usage
 if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, 
+                       format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
     # This is a simple demonstration of using the driver
     driver = EpsonDTGDriver()
     driver.set_debug_level(1)
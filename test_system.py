@@ -7,31 +7,86 @@ working correctly and that your environment is properly set up for
 reverse engineering Epson DTG printer protocols.
 """
 
+import io
 import os
 import sys
 import time
+import shutil
 import argparse
-import subprocess
-import importlib
 import platform
-from datetime import datetime
+from contextlib import redirect_stdout, redirect_stderr
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Host operating system, for display; looked up once
+_OS_DESCRIPTION = f"{platform.system()} {platform.release()}"
 
 # Required Python version
 REQUIRED_PYTHON = (3, 8)
 
 # Required dependencies
-REQUIRED_PACKAGES = [
+REQUIRED_PACKAGES = (
     "pyusb",
     "pillow",
     "numpy",
     "matplotlib",
     "pyyaml"
-]
+)
 
 # Optional dependencies
-OPTIONAL_PACKAGES = [
-    "pyshark"
-]
+OPTIONAL_PACKAGES = (
+    "pyshark",
+)
+
+# Dependency results that point to USB setup problems
+USB_RESULT_NAMES = frozenset(("pyusb", "USB Backend"))
+
+# Key files of the system
+COMPONENTS = (
+    ("USB Capture Tool", "tools/usb_capture.py"),
+    ("ESC/P Parser", "tools/escp_parser.py"),
+    ("Printer Commander", "tools/printer_commander.py"),
+    ("Command Dictionary", "tools/command_dictionary.py"),
+    ("Connection Test", "tools/connection_test.py"),
+    ("Test Pattern Generator", "tools/test_pattern.py"),
+    ("DTG Driver", "src/driver/epson_dtg.py")
+)
+
+# Banner lines for headers and sections
+WIDTH = 80
+HEADER_LINE = "=" * WIDTH
+SECTION_LINE = "-" * WIDTH
+
+@lru_cache(maxsize=1)
+def _probe_usb_backend():
+    """Return (available, name) for the first PyUSB backend that loads"""
+    import usb.core
+    import usb.backend.libusb1
+    import usb.backend.libusb0
+    
+    # Check for available backends
+    if usb.backend.libusb1.get_backend():
+        return True, "libusb1"
+    if usb.backend.libusb0.get_backend():
+        return True, "libusb0"
+    return False, "None"
+
+class Result(NamedTuple):
+    """A single check and its outcome (success None means info/warning)"""
+    name: str
+    value: str
+    success: Optional[bool]
+    message: Optional[str]
+
+# Results categories holding lists of Result
+RESULT_CATEGORIES = ("environment", "dependencies", "components")
+
+def _list_dir(path):
+    """Return the set of entry names in a directory (empty if it can't be read)"""
+    try:
+        return {entry.name for entry in os.scandir(path)}
+    except OSError:
+        return set()
 
 class SystemTester:
     """Tests the complete InkCraft RIP system"""
@@ -39,6 +94,7 @@ class SystemTester:
     def __init__(self, options=None):
         """Initialize the tester"""
         self.options = options or {}
+        self.quiet = self.options.get('quiet', False)  # Only print the summary
         self.results = {
             "environment": [],
             "dependencies": [],
@@ -81,10 +137,7 @@ class SystemTester:
         """Test the Python environment"""
         # Check Python version
         py_version = sys.version_info
-        version_ok = py_version.major > REQUIRED_PYTHON[0] or (
-            py_version.major == REQUIRED_PYTHON[0] and 
-            py_version.minor >= REQUIRED_PYTHON[1]
-        )
+        version_ok = py_version >= REQUIRED_PYTHON
         
         self._add_result("environment", 
                         "Python Version", 
@@ -93,27 +146,16 @@ class SystemTester:
                         f"Python {REQUIRED_PYTHON[0]}.{REQUIRED_PYTHON[1]}+ required")
         
         # Check operating system
-        os_name = platform.system()
-        os_version = platform.release()
-        
         self._add_result("environment", 
                         "Operating System", 
-                        f"{os_name} {os_version}",
+                        _OS_DESCRIPTION,
                         True,  # Not a pass/fail check
                         None)
         
         # Check environment variables
-        if os_name == "Windows":
-            path_var = os.environ.get("PATH", "")
-            # More robust check for Python in PATH on Windows
-            python_in_path = False
-            for p in path_var.split(";"):
-                p = p.strip('"')  # Remove quotes that might be in PATH
-                if p and os.path.exists(p):
-                    python_exe = os.path.join(p, "python.exe")
-                    if os.path.exists(python_exe):
-                        python_in_path = True
-                        break
+        if sys.platform == "win32":
+            # Search PATH the way the shell does, stopping at the first match
+            python_in_path = shutil.which("python.exe") is not None
             
             self._add_result("environment", 
                            "Python in PATH", 
@@ -132,27 +174,30 @@ class SystemTester:
             self._check_package(package, required=False)
     
     def _check_package(self, package_name, required=True):
-        """Check if a package is installed and its version"""
+        """Check if a package is installed (and its version, if requested)"""
+        import importlib
+        import importlib.util
+        
         try:
-            module = importlib.import_module(package_name)
-            version = getattr(module, "__version__", "Unknown")
+            # Modules that are already loaded don't need the import machinery
+            module = sys.modules.get(package_name)
+            if module is None:
+                # Locating the package is enough to know it is installed;
+                # only import it (running its top-level code) for the version
+                if importlib.util.find_spec(package_name) is None:
+                    raise ImportError(package_name)
+                if self.options.get('include_versions', False):
+                    module = importlib.import_module(package_name)
+            
+            if module is not None:
+                status = f"Installed (version: {getattr(module, '__version__', 'Unknown')})"
+            else:
+                status = "Installed"
             
             # Special check for pyusb to verify backend availability
             if package_name == "pyusb" or package_name == "usb":
-                backend_available = False
-                backend_name = "None"
                 try:
-                    import usb.core
-                    import usb.backend.libusb1
-                    import usb.backend.libusb0
-                    
-                    # Check for available backends
-                    if usb.backend.libusb1.get_backend():
-                        backend_available = True
-                        backend_name = "libusb1"
-                    elif usb.backend.libusb0.get_backend():
-                        backend_available = True
-                        backend_name = "libusb0"
+                    backend_available, backend_name = _probe_usb_backend()
                     
                     # Special message for missing backend
                     if not backend_available:
@@ -176,7 +221,7 @@ class SystemTester:
             
             self._add_result("dependencies", 
                            package_name, 
-                           f"Installed (version: {version})",
+                           status,
                            True,
                            None)
                            
@@ -192,7 +237,8 @@ class SystemTester:
     def test_components(self):
         """Test InkCraft RIP system components"""
         # Check if we're in the project directory
-        if not os.path.exists("tools") or not os.path.exists("src"):
+        listings = {".": _list_dir(".")}
+        if "tools" not in listings["."] or "src" not in listings["."]:
             self._add_result("components", 
                            "Project Structure", 
                            "Invalid",
@@ -201,18 +247,15 @@ class SystemTester:
             return
         
         # Check for key files
-        components = [
-            ("USB Capture Tool", "tools/usb_capture.py"),
-            ("ESC/P Parser", "tools/escp_parser.py"),
-            ("Printer Commander", "tools/printer_commander.py"),
-            ("Command Dictionary", "tools/command_dictionary.py"),
-            ("Connection Test", "tools/connection_test.py"),
-            ("Test Pattern Generator", "tools/test_pattern.py"),
-            ("DTG Driver", "src/driver/epson_dtg.py")
-        ]
-        
-        for name, path in components:
-            exists = os.path.exists(path)
+        # List each component directory once instead of checking every file
+        found = []
+        for name, path in COMPONENTS:
+            directory, filename = os.path.split(path)
+            if directory not in listings:
+                listings[directory] = _list_dir(directory)
+            exists = filename in listings[directory]
+            if exists:
+                found.append((name, path))
             self._add_result("components", 
                            name, 
                            "Found" if exists else "Missing",
@@ -220,49 +263,50 @@ class SystemTester:
                            f"Component {path} is missing" if not exists else None)
         
         # Check tools are executable
-        if platform.system() != "Windows":  # Skip executable check on Windows
-            for name, path in components:
-                if os.path.exists(path):
-                    executable = os.access(path, os.X_OK)
-                    if not executable:
-                        self._add_result("components", 
-                                       f"{name} (Executable)", 
-                                       "Not executable",
-                                       False,
-                                       f"Component {path} is not executable")
+        if sys.platform != "win32":  # Skip executable check on Windows
+            for name, path in found:
+                executable = os.access(path, os.X_OK)
+                if not executable:
+                    self._add_result("components", 
+                                   f"{name} (Executable)", 
+                                   "Not executable",
+                                   False,
+                                   f"Component {path} is not executable")
     
     def test_printer_connectivity(self):
         """Test connectivity to the printer"""
         try:
-            # Build the command to run the connection test
-            cmd = [sys.executable, "tools/connection_test.py"]
+            # Build the arguments for the connection test
+            args = []
             
             # Add vendor ID if specified
             if self.options.get('vendor_id'):
-                cmd.extend(["--vendor", self.options['vendor_id']])
+                args.extend(["--vendor", self.options['vendor_id']])
             
             # Add product ID if specified
             if self.options.get('product_id'):
-                cmd.extend(["--product", self.options['product_id']])
+                args.extend(["--product", self.options['product_id']])
             
             # Run the connection test
-            print("Running printer connection test...")
-            process = subprocess.run(cmd, capture_output=True, text=True)
+            if not self.quiet:
+                print("Running printer connection test...")
+            returncode, output, error = self._run_connection_test(args)
             
             # Check if the test succeeded
-            success = process.returncode == 0
+            success = returncode == 0
             
             # Store results
             self.results["connectivity"] = {
                 "success": success,
-                "output": process.stdout,
-                "error": process.stderr
+                "output": output,
+                "error": error
             }
             
             # Print the output
-            print(process.stdout)
-            if process.stderr:
-                print("Errors:", process.stderr)
+            if not self.quiet:
+                print(output)
+                if error:
+                    print("Errors:", error)
             
             return success
             
@@ -275,53 +319,65 @@ class SystemTester:
             }
             return False
     
+    def _run_connection_test(self, args):
+        """Run tools/connection_test.py and return (exit code, stdout, stderr)"""
+        try:
+            from tools import connection_test
+        except ImportError:
+            # Can't be imported from here; run it on its own so its error
+            # message is reported
+            import subprocess
+            process = subprocess.run([sys.executable, "tools/connection_test.py"] + args,
+                                     capture_output=True, text=True)
+            return process.returncode, process.stdout, process.stderr
+        
+        # Run in this interpreter, which already has its dependencies loaded
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                returncode = connection_test.main(args)
+            except SystemExit as e:
+                # Raised by argparse for invalid arguments
+                returncode = e.code if isinstance(e.code, int) else 1
+        return returncode, stdout.getvalue(), stderr.getvalue()
+    
     def _add_result(self, category, name, value, success, message):
         """Add a test result"""
-        result = {
-            "name": name,
-            "value": value,
-            "success": success,
-            "message": message
-        }
-        
-        self.results[category].append(result)
+        self.results[category].append(Result(name, value, success, message))
         
         # Update summary counters
+        summary = self.results["summary"]
         if success is False:
-            self.results["summary"]["failed"] += 1
+            summary["failed"] += 1
         elif success is True:
-            self.results["summary"]["passed"] += 1
+            summary["passed"] += 1
         else:  # None or other value indicates a warning or info
-            self.results["summary"]["warnings"] += 1
+            summary["warnings"] += 1
         
         # Print the result
-        status = "✓ " if success else "✗ "
-        details = f": {message}" if message else ""
-        
-        if success:
-            print(f"{status}{name}: {value}{details}")
-        else:
+        if not self.quiet:
+            status = "✓ " if success else "✗ "
+            details = f": {message}" if message else ""
             print(f"{status}{name}: {value}{details}")
     
     def _print_header(self, title):
         """Print a header"""
-        print("\n" + "=" * 80)
-        print(f"{title}".center(80))
-        print("=" * 80)
+        if not self.quiet:
+            print(f"\n{HEADER_LINE}\n{title.center(WIDTH)}\n{HEADER_LINE}")
     
     def _print_section(self, title):
         """Print a section header"""
-        print("\n" + "-" * 80)
-        print(f"{title}")
-        print("-" * 80)
+        if not self.quiet:
+            print(f"\n{SECTION_LINE}\n{title}\n{SECTION_LINE}")
     
     def _print_summary(self):
         """Print a summary of the test results"""
         self._print_section("Test Summary")
         
-        passed = self.results["summary"]["passed"]
-        failed = self.results["summary"]["failed"]
-        warnings = self.results["summary"]["warnings"]
+        summary = self.results["summary"]
+        passed = summary["passed"]
+        failed = summary["failed"]
+        warnings = summary["warnings"]
         total = passed + failed
         
         if total > 0:
@@ -329,15 +385,13 @@ class SystemTester:
         else:
             pass_rate = 0
         
-        print(f"Passed: {passed}/{total} tests ({pass_rate:.1f}%)")
-        print(f"Failed: {failed}")
-        print(f"Warnings/Info: {warnings}")
+        print(f"Passed: {passed}/{total} tests ({pass_rate:.1f}%)\n"
+              f"Failed: {failed}\n"
+              f"Warnings/Info: {warnings}")
         
         # Check if there were any issues with USB dependencies
-        usb_issues = False
-        for result in self.results["dependencies"]:
-            if ("pyusb" in result["name"] or "USB Backend" in result["name"]) and not result["success"]:
-                usb_issues = True
+        usb_issues = any(result.name in USB_RESULT_NAMES and not result.success
+                         for result in self.results["dependencies"])
         
         if usb_issues:
             self._print_usb_help()
@@ -346,14 +400,14 @@ class SystemTester:
             print("\n✓ All critical tests passed!")
             
             if not self.results["connectivity"] or not self.results["connectivity"]["success"]:
-                print("\n⚠️  Note: Printer connectivity test did not succeed.")
-                print("   This is only an issue if you're ready to start reverse engineering.")
-                print("   You can still develop and test the software without a printer.")
+                print("\n⚠️  Note: Printer connectivity test did not succeed.\n"
+                      "   This is only an issue if you're ready to start reverse engineering.\n"
+                      "   You can still develop and test the software without a printer.")
                 
-            print("\nNext steps:")
-            print("1. Review any warnings above")
-            print("2. Try capturing USB traffic with Wireshark and USBPcap")
-            print("3. Run the USB analysis script to analyze captured data")
+            print("\nNext steps:\n"
+                  "1. Review any warnings above\n"
+                  "2. Try capturing USB traffic with Wireshark and USBPcap\n"
+                  "3. Run the USB analysis script to analyze captured data")
             
         else:
             print("\n✗ Some tests failed. Please address the issues above before continuing.")
@@ -362,42 +416,55 @@ class SystemTester:
         """Print help information for USB dependencies"""
         self._print_section("USB Dependencies Help")
         
-        print("USB library issues were detected. Here's how to fix them:")
-        print("\n1. Install PyUSB package:")
-        print("   pip install pyusb")
-        
-        print("\n2. Install platform-specific USB drivers:")
+        # Build the whole message and write it at once
+        lines = [
+            "USB library issues were detected. Here's how to fix them:",
+            "\n1. Install PyUSB package:",
+            "   pip install pyusb",
+            "\n2. Install platform-specific USB drivers:",
+        ]
         
-        if platform.system() == "Windows":
-            print("\n   Windows:")
-            print("   - Option 1: Install libusb-win32 via Zadig (recommended):")
-            print("     a. Download Zadig from https://zadig.akeo.ie/")
-            print("     b. Connect your printer")
-            print("     c. Run Zadig, select your printer from the dropdown")
-            print("     d. Select libusb-win32 driver and click 'Install Driver'")
-            print("\n   - Option 2: Install via pip:")
-            print("     pip install pyusb[backend-libusb1]")
+        if sys.platform == "win32":
+            lines += [
+                "\n   Windows:",
+                "   - Option 1: Install libusb-win32 via Zadig (recommended):",
+                "     a. Download Zadig from https://zadig.akeo.ie/",
+                "     b. Connect your printer",
+                "     c. Run Zadig, select your printer from the dropdown",
+                "     d. Select libusb-win32 driver and click 'Install Driver'",
+                "\n   - Option 2: Install via pip:",
+                "     pip install pyusb[backend-libusb1]",
+            ]
             
-        elif platform.system() == "Darwin":
-            print("\n   macOS:")
-            print("   - Install libusb using Homebrew:")
-            print("     brew install libusb")
+        elif sys.platform == "darwin":
+            lines += [
+                "\n   macOS:",
+                "   - Install libusb using Homebrew:",
+                "     brew install libusb",
+            ]
             
         else:
-            print("\n   Linux:")
-            print("   - Install libusb development packages:")
-            print("     sudo apt-get install libusb-1.0-0-dev")
-            print("   - Add user to the plugdev group for USB access:")
-            print("     sudo usermod -a -G plugdev $USER")
-            print("     (Log out and back in for this to take effect)")
+            lines += [
+                "\n   Linux:",
+                "   - Install libusb development packages:",
+                "     sudo apt-get install libusb-1.0-0-dev",
+                "   - Add user to the plugdev group for USB access:",
+                "     sudo usermod -a -G plugdev $USER",
+                "     (Log out and back in for this to take effect)",
+            ]
             
-        print("\n3. Test USB library:")
-        print("   python -c \"import usb.core; print('USB library works!')\"")
-        print("\nIf problems persist, check the PyUSB documentation:")
-        print("   https://github.com/pyusb/pyusb")
+        lines += [
+            "\n3. Test USB library:",
+            "   python -c \"import usb.core; print('USB library works!')\"",
+            "\nIf problems persist, check the PyUSB documentation:",
+            "   https://github.com/pyusb/pyusb",
+        ]
+        print("\n".join(lines))
     
-    def save_results(self, filename=None):
-        """Save test results to a file"""
+    def save_results(self, filename=None, pretty=False):
+        """Save test results to a file (compact JSON unless pretty is set)"""
+        from datetime import datetime
+        
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"system_test_{timestamp}.json"
@@ -409,11 +476,20 @@ class SystemTester:
             self.results["system_info"] = {
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-                "os": f"{platform.system()} {platform.release()}"
+                "os": _OS_DESCRIPTION
             }
             
+            # Results are tuples in memory; write them out as objects
+            results = dict(self.results)
+            for category in RESULT_CATEGORIES:
+                results[category] = [result._asdict() for result in results[category]]
+            
             with open(filename, 'w') as f:
-                json.dump(self.results, f, indent=2)
+                if pretty:
+                    json.dump(results, f, indent=2)
+                else:
+                    # Without indent, json uses its C encoder
+                    json.dump(results, f, separators=(",", ":"))
                 
             print(f"\nTest results saved to {filename}")
             
@@ -429,12 +505,20 @@ def main():
     parser.add_argument("--save", action="store_true", 
                       help="Save test results to a file")
     parser.add_argument("--output", help="Output file for test results")
+    parser.add_argument("--include-versions", action="store_true",
+                      help="Import each dependency to report its version")
+    parser.add_argument("--quiet", action="store_true",
+                      help="Only print the test summary")
+    parser.add_argument("--pretty", action="store_true",
+                      help="Indent the saved test results for reading")
     
     args = parser.parse_args()
     
     # Set up options
     options = {
-        'test_printer': not args.skip_printer
+        'test_printer': not args.skip_printer,
+        'quiet': args.quiet,
+        'include_versions': args.include_versions
     }
     
     if args.vendor:
@@ -449,7 +533,7 @@ def main():
     
     # Save results if requested
     if args.save or args.output:
-        tester.save_results(args.output)
+        tester.save_results(args.output, pretty=args.pretty)
     
     return 0 if success else 1
 
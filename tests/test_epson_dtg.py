@@ -0,0 +1,187 @@
+"""Checks for the DTG driver's command stream, run against a fake USB device"""
+
+import os
+import sys
+import struct
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.driver import epson_dtg
+from src.driver.epson_dtg import EpsonDTGDriver, InkChannel, pack_position
+
+
+class FakeDevice:
+    """Records every bulk write instead of sending it, and answers reads from replies"""
+
+    def __init__(self, replies=()):
+        self.written = bytearray()
+        self.replies = list(replies)
+
+    def write(self, address, data, timeout=None):
+        self.written += bytes(data)
+        return len(data)
+
+    def read(self, address, buffer, timeout=None):
+        reply = self.replies.pop(0) if self.replies else b''
+        buffer[:len(reply)] = reply
+        return len(reply)
+
+
+def unpack_bits(data, count):
+    """Decode count bytes of TIFF PackBits data, returning (bytes, bytes consumed)"""
+    out = bytearray()
+    pos = 0
+    while len(out) < count:
+        counter = data[pos]
+        if counter < 128:
+            out += data[pos + 1:pos + counter + 2]
+            pos += counter + 2
+        else:
+            out += data[pos + 1:pos + 2] * (257 - counter)
+            pos += 2
+    return bytes(out), pos
+
+
+def raster_rows(stream):
+    """
+    Replay the position and ESC . commands in stream
+
+    Returns a dict mapping (x, y) in 1/3600 inch to the row printed there.
+    """
+    rows = {}
+    x = y = 0
+    pos = 0
+    while pos < len(stream):
+        assert stream[pos] == 0x1B, f"unexpected byte at {pos}"
+        command = stream[pos + 1:pos + 2]
+        if command == b'$':
+            x = struct.unpack_from('<H', stream, pos + 2)[0] * 10
+            pos += 4
+        elif command == b'(':
+            name = stream[pos + 2:pos + 3]
+            size = struct.unpack_from('<H', stream, pos + 3)[0]
+            if name == b'V':
+                y = struct.unpack_from('<H', stream, pos + 5)[0] * 10
+            pos += 5 + size
+        elif command == b'.':
+            c, v, h, m, width = struct.unpack_from('<4BH', stream, pos + 2)
+            pos += 8
+            row_bytes = (width + 7) // 8
+            for _ in range(m):
+                if c:
+                    row, used = unpack_bits(stream[pos:], row_bytes)
+                else:
+                    row, used = bytes(stream[pos:pos + row_bytes]), row_bytes
+                rows[(x, y)] = row
+                pos += used
+                y += v
+            x += width * h
+        else:
+            pos += 2
+    return rows
+
+
+def connected_driver():
+    """Return a driver that is initialized and writes to a FakeDevice"""
+    driver = EpsonDTGDriver()
+    driver.device = FakeDevice()
+    driver.endpoint_out = object()
+    driver._ep_out_addr = 0x01
+    driver._ep_out_mps = 512
+    driver.endpoint_in = object()
+    driver._ep_in_addr = 0x81
+    driver._ep_in_mps = 512
+    driver._rx_buffer = bytearray(512)
+    driver.is_connected = True
+    driver.is_initialized = True
+    return driver
+
+
+@mock.patch.object(epson_dtg, 'USB1_AVAILABLE', False)
+class SendImageDataTest(unittest.TestCase):
+    def test_position_resent_after_raster(self):
+        # Raster data moves the print position, so a second plane at the
+        # same origin must position the head again
+        driver = connected_driver()
+        image = bytes([0xFF]) * 8
+        position = pack_position(100, 100)
+
+        self.assertTrue(driver.send_image_data(image, 8, 8, x=100, y=100, color=InkChannel.CYAN))
+        self.assertEqual(driver.device.written.count(position), 1)
+
+        self.assertTrue(driver.send_image_data(image, 8, 8, x=100, y=100, color=InkChannel.MAGENTA))
+        self.assertEqual(driver.device.written.count(position), 2)
+
+    def test_rows_land_on_successive_lines(self):
+        # 100 rows span several ESC . blocks; each row has to print one dot
+        # below the previous one, starting at the requested origin
+        driver = connected_driver()
+        width, height = 64, 100
+        image = [bytes([row % 256]) * 4 + bytes(range(row, row + 4)) for row in range(height)]
+
+        self.assertTrue(driver.send_image_data(b''.join(image), width, height, x=100, y=200,
+                                               color=InkChannel.CYAN))
+        rows = raster_rows(driver.device.written)
+
+        dot = 3600 // driver.resolution[1]
+        expected = {(1000, 2000 + row * dot): image[row] for row in range(height)}
+        self.assertEqual(rows, expected)
+
+    def test_repeated_position_skipped_without_raster(self):
+        driver = connected_driver()
+
+        self.assertTrue(driver.set_position(100, 100))
+        self.assertTrue(driver.set_position(100, 100))
+        driver.flush()
+        self.assertEqual(driver.device.written.count(pack_position(100, 100)), 1)
+
+
+class ThresholdPackTest(unittest.TestCase):
+    def test_kernel_matches_packbits(self):
+        rng = np.random.default_rng(0)
+        for dtype in (np.uint8, np.float32):
+            # 13 dots leave a partly used last byte in every row
+            image = (rng.random((7, 13)) * 255).astype(dtype)
+            out = np.zeros((7, 2), dtype=np.uint8)
+            epson_dtg._threshold_pack(image, 127, out)
+            np.testing.assert_array_equal(out, np.packbits(image > 127, axis=1))
+
+    @mock.patch.object(epson_dtg, 'USB1_AVAILABLE', False)
+    def test_send_image_data_same_bytes_either_path(self):
+        image = (np.random.default_rng(1).random((10, 21)) * 255).astype(np.uint8)
+        streams = []
+        for numba_available in (True, False):
+            with mock.patch.object(epson_dtg, 'NUMBA_AVAILABLE', numba_available):
+                driver = connected_driver()
+                self.assertTrue(driver.send_image_data(image, 21, 10, x=0, y=0))
+                streams.append(bytes(driver.device.written))
+        self.assertEqual(streams[0], streams[1])
+
+
+class WaitUntilReadyTest(unittest.TestCase):
+    def test_reply_marks_status_query_supported(self):
+        driver = connected_driver()
+        driver.device.replies = [bytes([0x01]), bytes([epson_dtg.STATUS_READY])]
+
+        self.assertTrue(driver._wait_until_ready(budget=1.0))
+        self.assertTrue(driver._status_query_supported)
+        self.assertEqual(driver.device.written.count(epson_dtg.STATUS_QUERY), 2)
+
+    def test_silence_falls_back_to_fixed_delay(self):
+        driver = connected_driver()
+
+        self.assertFalse(driver._wait_until_ready(budget=0.2))
+        self.assertIs(driver._status_query_supported, False)
+
+        # Once known to be unsupported, the query is not sent again
+        sent = driver.device.written.count(epson_dtg.STATUS_QUERY)
+        self.assertFalse(driver._wait_until_ready(budget=0.05))
+        self.assertEqual(driver.device.written.count(epson_dtg.STATUS_QUERY), sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
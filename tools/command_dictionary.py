@@ -8,12 +8,30 @@ parameters, descriptions, and usage examples.
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import atexit
 import argparse
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Union
 
+# ijson is optional; with it, parser output is imported without loading it all into memory
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# orjson is optional; it loads and saves large databases much faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Define command categories
 CATEGORIES = {
     "INIT": "Initialization",
@@ -28,15 +46,116 @@ CATEGORIES = {
     "UNKNOWN": "Unknown Commands"
 }
 
+# Searches remembered per dictionary
+SEARCH_CACHE_SIZE = 256
+
+# Substring length indexed for search_commands; shorter terms are matched by a full scan
+NGRAM = 3
+
+# Whitespace and 0x prefixes, dropped from hex sequences in one pass
+_HEX_STRIP_RE = re.compile(r'\s|0[xX]')
+
+def _compact_hex(hex_sequence: str) -> str:
+    """Normalize a hex sequence to upper case without whitespace or 0x prefixes"""
+    return _HEX_STRIP_RE.sub('', hex_sequence).upper()
+
+def _ngrams(fields) -> set:
+    """Return every NGRAM-character substring of the given strings"""
+    return {field[i:i + NGRAM] for field in fields for i in range(len(field) - NGRAM + 1)}
+
+# Description keywords used to guess a command's category, in priority order
+CATEGORY_KEYWORDS = (
+    ('INIT', ('initialize', 'reset')),
+    ('COLOR', ('color', 'ink')),
+    ('WHITE', ('white',)),
+    ('POSITION', ('position', 'horizontal', 'vertical')),
+    ('IMAGE', ('image', 'graphics', 'bit image')),
+    ('QUALITY', ('quality', 'resolution')),
+    ('SETUP', ('unit', 'page', 'format')),
+)
+_CATEGORY_RANK = {category: rank for rank, (category, _) in enumerate(CATEGORY_KEYWORDS)}
+# A lookahead matches at every position, so overlapping keywords are all found
+_CATEGORY_PATTERN = re.compile("(?=" + "|".join(
+    f"(?P<{category}>{'|'.join(re.escape(keyword) for keyword in keywords)})"
+    for category, keywords in CATEGORY_KEYWORDS) + ")")
+
+def _normalize_hex(hex_sequence: str) -> Optional[str]:
+    """Return a hex sequence in storage form ("1B 40"), or None if it isn't valid hex"""
+    try:
+        return bytes.fromhex(_compact_hex(hex_sequence)).hex(' ').upper()
+    except ValueError:
+        return None
+
+class Command:
+    """
+    A discovered command; attributes mirror the keys stored in the database
+    
+    Keys this version doesn't know (e.g. added by hand or by a newer version)
+    are kept in extra and written back unchanged.
+    """
+    
+    # Database keys with their own attribute
+    FIELDS = ('id', 'hex', 'description', 'category', 'parameters', 'examples',
+              'notes', 'date_added', 'verified', 'date_updated')
+    __slots__ = FIELDS + ('extra',)
+    
+    def __init__(self, id: str, hex: str, description: str = "", category: str = "UNKNOWN",
+                 parameters: List[Dict[str, Any]] = None, examples: List[Dict[str, Any]] = None,
+                 notes: str = "", date_added: str = "", verified: bool = False,
+                 date_updated: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.hex = hex
+        self.description = description
+        self.category = category
+        self.parameters = parameters if parameters is not None else []
+        self.examples = examples if examples is not None else []
+        self.notes = notes
+        self.date_added = date_added
+        self.verified = verified
+        self.date_updated = date_updated  # None until the command is first updated
+        self.extra = extra if extra is not None else {}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Command':
+        """Create a command from its database entry"""
+        fields = {}
+        extra = {}
+        for key, value in data.items():
+            (fields if key in cls.FIELDS else extra)[key] = value
+        return cls(**fields, extra=extra)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the database entry for this command"""
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        if self.date_updated is None:
+            del data['date_updated']
+        data.update(self.extra)
+        return data
+
 class CommandDictionary:
     """Command dictionary for storing and organizing discovered commands"""
     
     def __init__(self, db_file: Optional[str] = None):
         """Initialize the command dictionary"""
         self.db_file = db_file or "command_dictionary.json"
+        
+        # Repeated searches are answered from a cache, cleared on every change
+        self._search_ids = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search_ids)
+        self._search_hex_ids = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search_hex_ids)
+        self._last_search = None  # (term, category, IDs) of the last search, narrowed by the next
+        
         self.commands = {}
+        self._hex_index = {}  # Compact hex -> IDs of the commands with that sequence
+        self._search_text = {}  # Command ID -> lowercased fields matched by search_commands, NUL-joined
+        self._ngram_index = {}  # Every NGRAM-character substring of those fields -> command IDs
+        self._positions = {}  # Command ID -> order in the dictionary, for sorting search hits
+        self._next_position = 0
+        self._dirty = False  # Changes not yet written to db_file
         self.load_database()
         
+        # Changes are written by flush(); make sure they reach the file on exit
+        atexit.register(self.flush)
+        
     def load_database(self) -> bool:
         """Load the command database from file"""
         if not os.path.exists(self.db_file):
@@ -44,8 +163,15 @@ class CommandDictionary:
             return True
             
         try:
-            with open(self.db_file, 'r') as f:
-                data = json.load(f)
+            if ORJSON_AVAILABLE:
+                # Parse straight from the mapped pages instead of copying the file
+                with open(self.db_file, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                        memoryview(mm) as view:
+                    data = orjson.loads(view)
+            else:
+                with open(self.db_file, 'rb') as f:
+                    data = json.load(f)
                 
             # Validate format
             if not isinstance(data, dict) or 'commands' not in data:
@@ -53,7 +179,9 @@ class CommandDictionary:
                 self._create_empty_database()
                 return False
                 
-            self.commands = data['commands']
+            self.commands = {cmd_id: Command.from_dict(cmd)
+                             for cmd_id, cmd in data['commands'].items()}
+            self._rebuild_indexes()
             return True
                 
         except Exception as e:
@@ -64,28 +192,131 @@ class CommandDictionary:
     def _create_empty_database(self) -> None:
         """Create an empty command database"""
         self.commands = {}
+        self._rebuild_indexes()
         self.save_database()
     
-    def save_database(self) -> bool:
-        """Save the command database to file"""
+    def _rebuild_indexes(self) -> None:
+        """Index every loaded command"""
+        self._clear_search_cache()
+        self._hex_index = {}
+        self._search_text = {}
+        self._ngram_index = {}
+        self._by_category = {}
+        self._positions = {}
+        self._next_position = 0
+        for cmd_id in self.commands:
+            self._index_command(cmd_id)
+    
+    def _clear_search_cache(self) -> None:
+        """Forget cached search results after the commands change"""
+        self._search_ids.cache_clear()
+        self._search_hex_ids.cache_clear()
+        self._last_search = None
+    
+    def _index_command(self, cmd_id: str) -> None:
+        """Add a command to the lookup indexes"""
+        self._clear_search_cache()
+        cmd = self.commands[cmd_id]
+        hex_compact = cmd.hex.replace(' ', '')
+        self._hex_index.setdefault(hex_compact, []).append(cmd_id)
+        # One string per command, so a search does a single substring test; the
+        # NUL separators keep a term from matching across two fields
+        text = '\0'.join((cmd_id.lower(), cmd.description.lower(),
+                           hex_compact.lower(), cmd.notes.lower()))
+        self._search_text[cmd_id] = text
+        for gram in _ngrams((text,)):
+            self._ngram_index.setdefault(gram, set()).add(cmd_id)
+        self._by_category.setdefault(cmd.category, {})[cmd_id] = None
+        # A replaced command keeps its place, like the key in self.commands
+        if cmd_id not in self._positions:
+            self._positions[cmd_id] = self._next_position
+            self._next_position += 1
+    
+    def _unindex_command(self, cmd_id: str) -> None:
+        """Remove a command from the lookup indexes"""
+        self._clear_search_cache()
+        cmd = self.commands[cmd_id]
+        hex_compact = cmd.hex.replace(' ', '')
+        ids = self._hex_index[hex_compact]
+        ids.remove(cmd_id)
+        if not ids:
+            del self._hex_index[hex_compact]
+        for gram in _ngrams((self._search_text.pop(cmd_id),)):
+            ids = self._ngram_index[gram]
+            ids.discard(cmd_id)
+            if not ids:
+                del self._ngram_index[gram]
+        ids = self._by_category[cmd.category]
+        del ids[cmd_id]
+        if not ids:
+            del self._by_category[cmd.category]
+    
+    def _category_ids(self, category: str) -> List[str]:
+        """IDs of the commands in a category, in dictionary order"""
+        # Buckets are mostly in order already, so this sort is close to linear
+        return sorted(self._by_category.get(category, ()), key=self._positions.__getitem__)
+    
+    def save_database(self, pretty: bool = False) -> bool:
+        """
+        Save the command database to file
+        
+        The file is written compactly to a temporary path and then moved
+        over the database, so an interrupted save never leaves a partial file.
+        
+        Args:
+            pretty: Indent the JSON for human reading
+            
+        Returns:
+            bool: True if saved successfully
+        """
+        tmp_file = self.db_file + '.tmp'
         try:
-            data = {
-                "info": {
-                    "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "commands_count": len(self.commands)
-                },
-                "commands": self.commands
+            info = {
+                "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "commands_count": len(self.commands)
             }
             
-            with open(self.db_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            if ORJSON_AVAILABLE and not pretty:
+                # Serialize entry by entry so the whole file never sits in memory
+                with open(tmp_file, 'wb') as f:
+                    f.write(b'{"info":' + orjson.dumps(info) + b',"commands":{')
+                    for i, (cmd_id, cmd) in enumerate(self.commands.items()):
+                        if i:
+                            f.write(b',')
+                        f.write(orjson.dumps({cmd_id: cmd.to_dict()})[1:-1])
+                    f.write(b'}}')
+            else:
+                data = {
+                    "info": info,
+                    "commands": {cmd_id: cmd.to_dict() for cmd_id, cmd in self.commands.items()}
+                }
+                if ORJSON_AVAILABLE:
+                    with open(tmp_file, 'wb') as f:
+                        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                else:
+                    # json.dump writes iterencode() chunks as they are produced
+                    with open(tmp_file, 'w') as f:
+                        if pretty:
+                            json.dump(data, f, indent=2)
+                        else:
+                            json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, self.db_file)
                 
+            self._dirty = False
             return True
                 
         except Exception as e:
             print(f"Error saving database: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
             return False
     
+    def flush(self) -> bool:
+        """Save the command database if it has unsaved changes"""
+        if not self._dirty:
+            return True
+        return self.save_database()
+    
     def add_command(self, cmd_id: str, hex_sequence: str, 
                     description: str = "", category: str = "UNKNOWN",
                     parameters: List[Dict[str, Any]] = None,
@@ -106,40 +337,59 @@ class CommandDictionary:
         Returns:
             bool: True if added successfully, False otherwise
         """
-        # Normalize hex sequence
-        hex_sequence = hex_sequence.upper().replace('0X', '').replace(' ', '')
-        if len(hex_sequence) % 2 != 0:
+        # Normalize and format hex sequence for storage
+        formatted_hex = _normalize_hex(hex_sequence)
+        if formatted_hex is None:
             print(f"Error: Invalid hex sequence '{hex_sequence}'")
             return False
         
-        # Format for storage
-        formatted_hex = ' '.join([hex_sequence[i:i+2] for i in range(0, len(hex_sequence), 2)])
-        
         # Validate category
         if category not in CATEGORIES:
             print(f"Warning: Unknown category '{category}', using 'UNKNOWN'")
             category = "UNKNOWN"
         
-        # Create command entry
-        command = {
-            "id": cmd_id,
-            "hex": formatted_hex,
-            "description": description,
-            "category": category,
-            "parameters": parameters or [],
-            "examples": examples or [],
-            "notes": notes,
-            "date_added": datetime.now().strftime("%Y-%m-%d"),
-            "verified": False
-        }
-        
-        # Add to dictionary
-        self.commands[cmd_id] = command
-        self.save_database()
+        self._store_command(cmd_id, formatted_hex, description, category,
+                            parameters, examples, notes)
         
         print(f"Added command {cmd_id} ({formatted_hex})")
         return True
     
+    def _add_command_fast(self, cmd_id: str, hex_sequence: str, description: str,
+                          category: str, parameters: List[Dict[str, Any]], today: str) -> bool:
+        """
+        Add a command during a bulk import, unless its hex sequence is already known
+        
+        Skips the category check (callers pass a valid one) and the per-command
+        message; the caller is responsible for flush(). today is the date_added
+        string, formatted once per import rather than once per command.
+        
+        Returns:
+            bool: True if the command was added, False if invalid or already known
+        """
+        formatted_hex = _normalize_hex(hex_sequence)
+        if formatted_hex is None or formatted_hex.replace(' ', '') in self._hex_index:
+            return False
+        
+        self._store_command(cmd_id, formatted_hex, description, category, parameters,
+                            date_added=today)
+        return True
+    
+    def _store_command(self, cmd_id: str, formatted_hex: str, description: str,
+                       category: str, parameters: List[Dict[str, Any]] = None,
+                       examples: List[Dict[str, Any]] = None, notes: str = "",
+                       date_added: str = None) -> None:
+        """Create a command entry and add it to the dictionary and indexes"""
+        command = Command(cmd_id, formatted_hex, description, category,
+                          parameters or [], examples or [], notes,
+                          date_added or datetime.now().strftime("%Y-%m-%d"))
+        
+        # Add to dictionary, replacing any command with the same ID; saved on flush()
+        if cmd_id in self.commands:
+            self._unindex_command(cmd_id)
+        self.commands[cmd_id] = command
+        self._index_command(cmd_id)
+        self._dirty = True
+    
     def update_command(self, cmd_id: str, **kwargs) -> bool:
         """
         Update an existing command in the dictionary
@@ -156,22 +406,25 @@ class CommandDictionary:
             return False
         
         # Update specified fields
+        self._unindex_command(cmd_id)
         for key, value in kwargs.items():
             if key == 'hex_sequence':
-                # Normalize hex sequence
-                hex_sequence = value.upper().replace('0X', '').replace(' ', '')
-                if len(hex_sequence) % 2 != 0:
-                    print(f"Error: Invalid hex sequence '{hex_sequence}'")
+                # Normalize and format hex sequence for storage
+                formatted_hex = _normalize_hex(value)
+                if formatted_hex is None:
+                    print(f"Error: Invalid hex sequence '{value}'")
                     continue
                 
-                # Format for storage
-                formatted_hex = ' '.join([hex_sequence[i:i+2] for i in range(0, len(hex_sequence), 2)])
-                self.commands[cmd_id]['hex'] = formatted_hex
+                self.commands[cmd_id].hex = formatted_hex
+            elif key in Command.FIELDS:
+                setattr(self.commands[cmd_id], key, value)
             else:
-                self.commands[cmd_id][key] = value
+                # Kept alongside the known fields, as for keys loaded from the file
+                self.commands[cmd_id].extra[key] = value
+        self._index_command(cmd_id)
         
-        self.commands[cmd_id]['date_updated'] = datetime.now().strftime("%Y-%m-%d")
-        self.save_database()
+        self.commands[cmd_id].date_updated = datetime.now().strftime("%Y-%m-%d")
+        self._dirty = True
         
         print(f"Updated command {cmd_id}")
         return True
@@ -190,13 +443,15 @@ class CommandDictionary:
             print(f"Error: Command '{cmd_id}' not found")
             return False
         
+        self._unindex_command(cmd_id)
+        del self._positions[cmd_id]
         del self.commands[cmd_id]
-        self.save_database()
+        self._dirty = True
         
         print(f"Deleted command {cmd_id}")
         return True
     
-    def get_command(self, cmd_id: str) -> Optional[Dict[str, Any]]:
+    def get_command(self, cmd_id: str) -> Optional[Command]:
         """
         Get a command by its identifier
         
@@ -204,11 +459,11 @@ class CommandDictionary:
             cmd_id: Command identifier
             
         Returns:
-            Command dictionary or None if not found
+            Command or None if not found
         """
         return self.commands.get(cmd_id)
     
-    def search_commands(self, search_term: str, category: str = None) -> List[Dict[str, Any]]:
+    def search_commands(self, search_term: str, category: str = None) -> List[Command]:
         """
         Search commands by text or hex pattern
         
@@ -219,24 +474,50 @@ class CommandDictionary:
         Returns:
             List of matching commands
         """
+        search_term_lower = search_term.lower()
+        return [self.commands[cmd_id] for cmd_id in self._search_ids(search_term_lower, category)]
+    
+    def _search_ids(self, search_term_lower: str, category: Optional[str]) -> tuple:
+        """IDs of the commands search_commands returns (cached per instance)"""
         results = []
+        last = self._last_search
         
-        for cmd_id, cmd in self.commands.items():
+        if (last and last[0] in search_term_lower and
+                (last[1] is None or last[1] == category)):
+            # The term extends the previous one, so it can only match a subset of its hits
+            cmd_ids = last[2]
+        elif len(search_term_lower) >= NGRAM:
+            # Only commands containing every n-gram of the term can match
+            candidates = None
+            for gram in sorted(_ngrams((search_term_lower,)),
+                               key=lambda g: len(self._ngram_index.get(g, ()))):
+                ids = self._ngram_index.get(gram)
+                if not ids:
+                    return ()
+                candidates = set(ids) if candidates is None else candidates & ids
+            if category:
+                candidates = candidates.intersection(self._by_category.get(category, ()))
+            cmd_ids = sorted(candidates, key=self._positions.__getitem__)
+        elif category:
+            cmd_ids = self._category_ids(category)
+        else:
+            cmd_ids = self.commands
+        
+        for cmd_id in cmd_ids:
+            cmd = self.commands[cmd_id]
             # Skip if category filter is specified and doesn't match
-            if category and cmd['category'] != category:
+            if category and cmd.category != category:
                 continue
                 
-            # Search in ID, description, hex, and notes
-            search_term_lower = search_term.lower()
-            if (search_term_lower in cmd_id.lower() or
-                search_term_lower in cmd['description'].lower() or
-                search_term_lower in cmd['hex'].lower().replace(' ', '') or
-                search_term_lower in cmd['notes'].lower()):
-                results.append(cmd)
+            # Search in ID, description, hex, and notes (lowercased when indexed)
+            if search_term_lower in self._search_text[cmd_id]:
+                results.append(cmd_id)
         
+        results = tuple(results)
+        self._last_search = (search_term_lower, category, results)
         return results
     
-    def search_by_hex(self, hex_pattern: str) -> List[Dict[str, Any]]:
+    def search_by_hex(self, hex_pattern: str) -> List[Command]:
         """
         Search commands by exact hex pattern
         
@@ -247,17 +528,20 @@ class CommandDictionary:
             List of matching commands
         """
         # Normalize input
-        hex_pattern = hex_pattern.upper().replace('0X', '').replace(' ', '')
-        
-        results = []
-        for cmd_id, cmd in self.commands.items():
-            cmd_hex = cmd['hex'].replace(' ', '')
+        hex_pattern = _compact_hex(hex_pattern)
+        return [self.commands[cmd_id] for cmd_id in self._search_hex_ids(hex_pattern)]
+    
+    def _search_hex_ids(self, hex_pattern: str) -> tuple:
+        """IDs of the commands search_by_hex returns (cached per instance)"""
+        # Match against each distinct sequence once, then keep dictionary order
+        matches = set()
+        for cmd_hex, ids in self._hex_index.items():
             if hex_pattern in cmd_hex:
-                results.append(cmd)
+                matches.update(ids)
         
-        return results
+        return tuple(cmd_id for cmd_id in self.commands if cmd_id in matches)
     
-    def list_commands(self, category: str = None) -> List[Dict[str, Any]]:
+    def list_commands(self, category: str = None) -> List[Command]:
         """
         List all commands, optionally filtered by category
         
@@ -268,7 +552,7 @@ class CommandDictionary:
             List of commands
         """
         if category:
-            return [cmd for cmd in self.commands.values() if cmd['category'] == category]
+            return [self.commands[cmd_id] for cmd_id in self._category_ids(category)]
         else:
             return list(self.commands.values())
     
@@ -283,47 +567,50 @@ class CommandDictionary:
             Number of commands imported
         """
         try:
-            with open(parser_file, 'r') as f:
-                parser_data = json.load(f)
+            with open(parser_file, 'rb') as f:
+                if IJSON_AVAILABLE:
+                    # Stream one entry at a time instead of loading the whole file
+                    entries = ijson.items(f, 'parsed_data.item')
+                else:
+                    parser_data = json.load(f)
+                    if 'parsed_data' not in parser_data:
+                        print(f"Error: Invalid parser file format in {parser_file}")
+                        return 0
+                    entries = parser_data['parsed_data']
                 
-            if 'parsed_data' not in parser_data:
-                print(f"Error: Invalid parser file format in {parser_file}")
-                return 0
-            
-            count = 0
-            for entry in parser_data['parsed_data']:
-                if 'parsed_commands' not in entry:
-                    continue
-                    
-                for cmd in entry['parsed_commands']:
-                    if 'command' not in cmd or 'description' not in cmd:
+                count = 0
+                today = datetime.now().strftime("%Y-%m-%d")
+                for entry in entries:
+                    if 'parsed_commands' not in entry:
                         continue
                         
-                    # Generate a command ID from the description
-                    desc = cmd['description']
-                    cmd_id = desc.upper().replace(' ', '_')
-                    if len(cmd_id) > 30:
-                        cmd_id = cmd_id[:30]
-                        
-                    # Check if already exists
-                    existing = self.search_by_hex(cmd['command'])
-                    if existing:
-                        continue
-                        
-                    # Add to dictionary
-                    self.add_command(
-                        cmd_id=cmd_id,
-                        hex_sequence=cmd['command'],
-                        description=desc,
-                        category=self._categorize_command(desc),
-                        parameters=[{
-                            "name": "params",
-                            "description": "Command parameters",
-                            "value": cmd.get('parameters', '')
-                        }]
-                    )
-                    count += 1
+                    for cmd in entry['parsed_commands']:
+                        if 'command' not in cmd or 'description' not in cmd:
+                            continue
+                            
+                        # Generate a command ID from the description
+                        desc = cmd['description']
+                        cmd_id = desc.upper().replace(' ', '_')
+                        if len(cmd_id) > 30:
+                            cmd_id = cmd_id[:30]
+                            
+                        # Add to dictionary unless the sequence already exists
+                        if self._add_command_fast(
+                            cmd_id=cmd_id,
+                            hex_sequence=cmd['command'],
+                            description=desc,
+                            category=self._categorize_command(desc),
+                            parameters=[{
+                                "name": "params",
+                                "description": "Command parameters",
+                                "value": cmd.get('parameters', '')
+                            }],
+                            today=today
+                        ):
+                            count += 1
             
+            # Write the whole import at once
+            self.flush()
             return count
                 
         except Exception as e:
@@ -340,24 +627,16 @@ class CommandDictionary:
         Returns:
             Category identifier
         """
-        description = description.lower()
-        
-        if any(x in description for x in ['initialize', 'reset']):
-            return 'INIT'
-        elif any(x in description for x in ['color', 'ink']):
-            return 'COLOR'
-        elif any(x in description for x in ['white']):
-            return 'WHITE'
-        elif any(x in description for x in ['position', 'horizontal', 'vertical']):
-            return 'POSITION'
-        elif any(x in description for x in ['image', 'graphics', 'bit image']):
-            return 'IMAGE'
-        elif any(x in description for x in ['quality', 'resolution']):
-            return 'QUALITY'
-        elif any(x in description for x in ['unit', 'page', 'format']):
-            return 'SETUP'
-        else:
-            return 'UNKNOWN'
+        # Every keyword occurrence (overlapping ones included) in one scan;
+        # the earliest category in CATEGORY_KEYWORDS wins, as in the table
+        best = None
+        for match in _CATEGORY_PATTERN.finditer(description.lower()):
+            rank = _CATEGORY_RANK[match.lastgroup]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return CATEGORY_KEYWORDS[best][0] if best is not None else 'UNKNOWN'
     
     def print_command(self, cmd_id: str) -> None:
         """Print a command in a readable format"""
@@ -367,35 +646,35 @@ class CommandDictionary:
             return
             
         print("\n" + "=" * 50)
-        print(f"Command: {cmd['id']}")
+        print(f"Command: {cmd.id}")
         print("=" * 50)
-        print(f"Hex: {cmd['hex']}")
-        print(f"Category: {cmd['category']} ({CATEGORIES[cmd['category']]})")
-        print(f"Description: {cmd['description']}")
+        print(f"Hex: {cmd.hex}")
+        print(f"Category: {cmd.category} ({CATEGORIES[cmd.category]})")
+        print(f"Description: {cmd.description}")
         
-        if cmd['parameters']:
+        if cmd.parameters:
             print("\nParameters:")
-            for param in cmd['parameters']:
+            for param in cmd.parameters:
                 print(f"  - {param['name']}: {param['description']}")
                 if 'value' in param:
                     print(f"    Value: {param['value']}")
         
-        if cmd['examples']:
+        if cmd.examples:
             print("\nExamples:")
-            for i, example in enumerate(cmd['examples']):
+            for i, example in enumerate(cmd.examples):
                 print(f"  Example {i+1}: {example['description']}")
                 print(f"    Command: {example['command']}")
                 if 'result' in example:
                     print(f"    Result: {example['result']}")
         
-        if cmd['notes']:
-            print(f"\nNotes: {cmd['notes']}")
+        if cmd.notes:
+            print(f"\nNotes: {cmd.notes}")
             
-        print(f"\nAdded: {cmd['date_added']}")
-        if 'date_updated' in cmd:
-            print(f"Last Updated: {cmd['date_updated']}")
+        print(f"\nAdded: {cmd.date_added}")
+        if cmd.date_updated:
+            print(f"Last Updated: {cmd.date_updated}")
             
-        print(f"Verified: {'Yes' if cmd['verified'] else 'No'}")
+        print(f"Verified: {'Yes' if cmd.verified else 'No'}")
         print("-" * 50)
 
 def main():
@@ -452,6 +731,9 @@ def main():
     example_parser.add_argument('--cmd', required=True, help='Example command')
     example_parser.add_argument('--result', help='Example result')
     
+    # Rewrite the database indented for reading
+    subparsers.add_parser('format', help='Rewrite the database file with indentation')
+    
     # Database file
     parser.add_argument('--db', help='Database file path', default='command_dictionary.json')
     
@@ -494,20 +776,20 @@ def main():
         results = dictionary.search_commands(args.term, args.cat)
         print(f"\nFound {len(results)} command(s) matching '{args.term}':")
         for cmd in results:
-            print(f"  {cmd['id']}: {cmd['hex']} - {cmd['description']}")
+            print(f"  {cmd.id}: {cmd.hex} - {cmd.description}")
     
     elif args.command == 'hex':
         results = dictionary.search_by_hex(args.pattern)
         print(f"\nFound {len(results)} command(s) with hex pattern '{args.pattern}':")
         for cmd in results:
-            print(f"  {cmd['id']}: {cmd['hex']} - {cmd['description']}")
+            print(f"  {cmd.id}: {cmd.hex} - {cmd.description}")
     
     elif args.command == 'list':
         results = dictionary.list_commands(args.cat)
         category_name = CATEGORIES[args.cat] if args.cat else "all categories"
         print(f"\nListing {len(results)} command(s) from {category_name}:")
         for cmd in results:
-            print(f"  {cmd['id']}: {cmd['hex']} - {cmd['description']}")
+            print(f"  {cmd.id}: {cmd.hex} - {cmd.description}")
     
     elif args.command == 'import':
         count = dictionary.import_from_parser(args.file)
@@ -526,13 +808,18 @@ def main():
         if args.result:
             example["result"] = args.result
             
-        cmd['examples'].append(example)
-        dictionary.update_command(args.id, examples=cmd['examples'])
+        cmd.examples.append(example)
+        dictionary.update_command(args.id, examples=cmd.examples)
+    
+    elif args.command == 'format':
+        if not dictionary.save_database(pretty=True):
+            return 1
+        print(f"Formatted {args.db}")
     
     else:
         parser.print_help()
     
-    return 0
+    return 0 if dictionary.flush() else 1
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -11,27 +11,37 @@ import os
 import sys
 import time
 import argparse
-import platform
 from datetime import datetime
 
+# Checked in main(), so importing ConnectionTester (or running --help) works without PyUSB
 try:
     import usb.core
     import usb.util
+    PYUSB_AVAILABLE = True
 except ImportError:
-    print("Error: PyUSB library not found.")
-    print("Please install it using: pip install pyusb")
-    sys.exit(1)
+    PYUSB_AVAILABLE = False
 
 # Epson vendor ID
 EPSON_VENDOR_ID = 0x04b8
 
+# String descriptors shown for the printer: result key, descriptor index attribute, label
+DEVICE_STRINGS = (
+    ("manufacturer", "iManufacturer", "Manufacturer"),
+    ("product", "iProduct", "Product"),
+    ("serial_number", "iSerialNumber", "Serial Number"),
+)
+
+# Pause after a test command that has no response to wait for (per-command "settle_ms" overrides)
+DEFAULT_SETTLE_MS = 50
+
 # Test sequence
 TEST_COMMANDS = [
     {
         "name": "Initialize Printer",
         "hex": "1B 40",  # ESC @
         "purpose": "Reset the printer to its initial state",
-        "expect_response": False
+        "expect_response": False,
+        "settle_ms": 500  # A reset takes the printer a while
     },
     {
         "name": "Status Request",
@@ -41,6 +51,11 @@ TEST_COMMANDS = [
     }
 ]
 
+# Command bytes, converted once at import; "hex" stays for display and the saved results
+for _test in TEST_COMMANDS:
+    _test["bytes"] = bytes.fromhex(_test["hex"])
+del _test
+
 # Test patterns for more thorough testing
 TEST_PATTERNS = {
     "BASIC": [0, 1],  # Just the basic commands
@@ -49,7 +64,8 @@ TEST_PATTERNS = {
 }
 
 class ConnectionTester:
-    def __init__(self, vendor_id=EPSON_VENDOR_ID, product_id=None, interface_num=0):
+    def __init__(self, vendor_id=EPSON_VENDOR_ID, product_id=None, interface_num=0, verbose=False,
+                 list_devices=False):
         self.vendor_id = vendor_id
         self.product_id = product_id  # Can be None to try any Epson printer
         self.interface_num = interface_num
@@ -58,10 +74,20 @@ class ConnectionTester:
         self.endpoint_in = None
         self.endpoint_out = None
         self.test_results = []
+        self.verbose = verbose  # Read product strings while finding printers
+        self.list_devices = list_devices  # Enumerate every matching device, not just the first
+        self._product = None  # Product string read by find_printer, if any
+        self._strings = None  # String descriptors of self.device, read once
+        self._strings_error = None
         
     def find_printer(self):
         """Find the DTG printer connected via USB"""
         try:
+            # A printer found earlier in this run is still the one to use;
+            # --list has to enumerate the bus to show every device
+            if self.device is not None and not self.list_devices:
+                return True
+                
             # If product ID is specified, look for that specific printer
             if self.product_id:
                 self.device = usb.core.find(idVendor=self.vendor_id, idProduct=self.product_id)
@@ -72,26 +98,42 @@ class ConnectionTester:
                     print(f"No printer found with VID:PID = {self.vendor_id:04x}:{self.product_id:04x}")
                     return False
             
-            # If no product ID is specified, look for any Epson printer
-            devices = list(usb.core.find(idVendor=self.vendor_id, find_all=True))
+            # If no product ID is specified, look for any Epson printer.
+            # find_all yields devices lazily, so without --list only the first one is opened
+            found = usb.core.find(idVendor=self.vendor_id, find_all=True)
+            if self.list_devices:
+                devices = list(found)
+            else:
+                first = next(iter(found), None)
+                devices = [first] if first is not None else []
             if not devices:
                 print(f"No Epson printers found (Vendor ID: {self.vendor_id:04x})")
                 return False
                 
-            # List all found printers
-            print(f"Found {len(devices)} Epson device(s):")
+            if self.list_devices:
+                print(f"Found {len(devices)} Epson device(s):")
+            products = []
             for i, dev in enumerate(devices):
-                try:
-                    product = usb.util.get_string(dev, dev.iProduct) if dev.iProduct else "Unknown"
-                except:
-                    product = "Unknown"
-                    
-                print(f"  {i+1}. {product} (VID:PID = {dev.idVendor:04x}:{dev.idProduct:04x})")
+                # Each string read is a control transfer, so only read names when asked to
+                product = None
+                if self.verbose:
+                    try:
+                        product = usb.util.get_string(dev, dev.iProduct) if dev.iProduct else None
+                    except:
+                        pass
+                if self.list_devices:
+                    if self.verbose:
+                        print(f"  {i+1}. {product or 'Unknown'} (VID:PID = {dev.idVendor:04x}:{dev.idProduct:04x})")
+                    else:
+                        print(f"  {i+1}. VID:PID = {dev.idVendor:04x}:{dev.idProduct:04x}")
+                products.append(product)
                 
-            # Use the first printer found
+            # Use the first printer found, keeping its product string for setup_connection
             self.device = devices[0]
             self.product_id = self.device.idProduct
-            print(f"\nSelected printer: VID:PID = {self.vendor_id:04x}:{self.product_id:04x}")
+            self._product = products[0]
+            name = f"{self._product}, " if self._product else ""
+            print(f"\nSelected printer: {name}VID:PID = {self.vendor_id:04x}:{self.product_id:04x}")
             return True
                 
         except Exception as e:
@@ -106,20 +148,12 @@ class ConnectionTester:
         try:
             # Get device information
             print("\nPrinter Information:")
-            try:
-                if hasattr(self.device, 'iManufacturer') and self.device.iManufacturer:
-                    manufacturer = usb.util.get_string(self.device, self.device.iManufacturer)
-                    print(f"  Manufacturer: {manufacturer}")
-                
-                if hasattr(self.device, 'iProduct') and self.device.iProduct:
-                    product = usb.util.get_string(self.device, self.device.iProduct)
-                    print(f"  Product: {product}")
-                
-                if hasattr(self.device, 'iSerialNumber') and self.device.iSerialNumber:
-                    serial = usb.util.get_string(self.device, self.device.iSerialNumber)
-                    print(f"  Serial Number: {serial}")
-            except Exception as e:
-                print(f"  Warning: Could not read device strings: {e}")
+            strings = self._device_strings()
+            for key, _, label in DEVICE_STRINGS:
+                if key in strings:
+                    print(f"  {label}: {strings[key]}")
+            if self._strings_error:
+                print(f"  Warning: Could not read device strings: {self._strings_error}")
             
             print(f"  VID:PID: {self.device.idVendor:04x}:{self.device.idProduct:04x}")
             
@@ -133,7 +167,7 @@ class ConnectionTester:
             print(f"  Interface: {self.interface.bInterfaceNumber}")
             
             # Detach kernel driver if active (AFTER getting interface)
-            if platform.system() != 'Windows':  # Only on non-Windows systems
+            if sys.platform != 'win32':  # Only on non-Windows systems
                 try:
                     if self.device.is_kernel_driver_active(self.interface.bInterfaceNumber):
                         self.device.detach_kernel_driver(self.interface.bInterfaceNumber)
@@ -162,24 +196,54 @@ class ConnectionTester:
             print(f"Error setting up connection: {e}")
             return False
     
-    def run_tests(self, test_pattern="BASIC"):
-        """Run communication tests with the printer"""
+    def _device_strings(self):
+        """Return the printer's string descriptors, reading them on first use only"""
+        if self._strings is None:
+            self._strings = {}
+            try:
+                for key, index_name, _ in DEVICE_STRINGS:
+                    index = getattr(self.device, index_name, None)
+                    if key == "product" and self._product is not None:
+                        self._strings[key] = self._product
+                    elif index:
+                        self._strings[key] = usb.util.get_string(self.device, index)
+            except Exception as e:
+                self._strings_error = e
+        return self._strings
+    
+    def run_tests(self, test_pattern="BASIC", batch=False):
+        """
+        Run communication tests with the printer
+        
+        Args:
+            test_pattern: Name of the pattern in TEST_PATTERNS
+            batch: Send every command of the pattern in one write, then read the
+                responses, instead of one write (and pause) per test
+        """
         if not self.endpoint_out or not self.endpoint_in:
             print("Error: Printer not connected")
             return False
             
         pattern = TEST_PATTERNS.get(test_pattern.upper(), TEST_PATTERNS["BASIC"])
+        tests = [TEST_COMMANDS[test_idx] for test_idx in pattern]
         
         print(f"\nRunning {test_pattern} test pattern ({len(pattern)} tests):")
         success_count = 0
         
-        for i, test_idx in enumerate(pattern):
-            test = TEST_COMMANDS[test_idx]
+        if batch:
+            batch_results = self.send_test_batch(
+                [test['bytes'] for test in tests],
+                [test['expect_response'] for test in tests])
+        
+        for i, test in enumerate(tests):
             print(f"\nTest {i+1}: {test['name']}")
             print(f"  Purpose: {test['purpose']}")
             print(f"  Command: {test['hex']}")
             
-            result = self.send_test_command(test['hex'], test['expect_response'])
+            if batch:
+                result = batch_results[i]
+            else:
+                result = self.send_test_command(test['bytes'], test['expect_response'])
             if result['success']:
                 success_count += 1
                 print(f"  Result: SUCCESS")
@@ -197,14 +261,15 @@ class ConnectionTester:
                 "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
             })
             
-            # Brief pause between tests
-            time.sleep(0.5)
+            # Let the printer settle; a command's response already shows it is done
+            if not batch and not test['expect_response']:
+                time.sleep(test.get('settle_ms', DEFAULT_SETTLE_MS) / 1000)
             
         print(f"\nTest Summary: {success_count}/{len(pattern)} tests passed")
         return success_count == len(pattern)
     
-    def send_test_command(self, hex_command, expect_response=False):
-        """Send a test command to the printer"""
+    def send_test_command(self, command, expect_response=False):
+        """Send a test command (bytes) to the printer"""
         result = {
             "success": False,
             "response": None,
@@ -212,14 +277,6 @@ class ConnectionTester:
         }
         
         try:
-            # Convert hex string to bytes
-            hex_command = hex_command.replace(' ', '')
-            if len(hex_command) % 2 != 0:
-                result['error'] = "Invalid hex command (odd length)"
-                return result
-                
-            command = bytes.fromhex(hex_command)
-            
             # Send command
             bytes_written = self.device.write(self.endpoint_out.bEndpointAddress, command)
             
@@ -228,24 +285,8 @@ class ConnectionTester:
                 return result
                 
             # Read response if expected
-            if expect_response:
-                try:
-                    response = self.device.read(
-                        self.endpoint_in.bEndpointAddress,
-                        self.endpoint_in.wMaxPacketSize,
-                        timeout=1000
-                    )
-                    
-                    if response:
-                        result['response'] = ' '.join([f"{b:02x}" for b in response])
-                except usb.core.USBError as e:
-                    if e.args and len(e.args) > 0 and isinstance(e.args[0], str) and 'timeout' in e.args[0].lower():
-                        if expect_response:
-                            result['error'] = "No response received (timeout)"
-                            return result
-                    else:
-                        result['error'] = f"USB error: {e}"
-                        return result
+            if expect_response and not self._read_test_response(result):
+                return result
             
             result['success'] = True
             return result
@@ -254,8 +295,89 @@ class ConnectionTester:
             result['error'] = f"Error: {e}"
             return result
     
+    def send_test_batch(self, commands, expect_responses):
+        """
+        Send several test commands in one bulk write, then read their responses
+        
+        Each write is a round trip to the printer, so joining the commands
+        removes all but one of them. Responses are read in command order after
+        the write.
+        
+        Returns:
+            list: One result dict per command, as from send_test_command
+        """
+        results = [{"success": False, "response": None, "error": None} for _ in commands]
+        
+        try:
+            bytes_written = self.send_bulk(commands)
+            total = sum(len(command) for command in commands)
+            if bytes_written != total:
+                for result in results:
+                    result['error'] = f"Failed to write all bytes (wrote {bytes_written}/{total})"
+                return results
+            
+            for expect_response, result in zip(expect_responses, results):
+                if expect_response and not self._read_test_response(result):
+                    continue
+                result['success'] = True
+                
+        except Exception as e:
+            for result in results:
+                if not result['success'] and not result['error']:
+                    result['error'] = f"Error: {e}"
+        
+        return results
+    
+    def send_bulk(self, commands, chunk=1 << 20):
+        """
+        Write commands to the printer as few large bulk transfers
+        
+        Args:
+            commands: Command byte strings, sent back to back
+            chunk: Most bytes per write; rounded down to whole packets so only
+                the final transfer can be short
+            
+        Returns:
+            int: Number of bytes written
+        """
+        data = b''.join(commands)
+        packet_size = self.endpoint_out.wMaxPacketSize
+        chunk = max(packet_size, chunk - chunk % packet_size)
+        
+        written = 0
+        while written < len(data):
+            count = self.device.write(self.endpoint_out.bEndpointAddress,
+                                      data[written:written + chunk])
+            written += count
+            if count == 0:
+                break
+        return written
+    
+    def _read_test_response(self, result):
+        """Read a response into result; False (with result['error'] set) on failure"""
+        try:
+            response = self.device.read(
+                self.endpoint_in.bEndpointAddress,
+                self.endpoint_in.wMaxPacketSize,
+                timeout=1000
+            )
+            
+            if response:
+                result['response'] = memoryview(response).hex(' ')
+        except usb.core.USBError as e:
+            if e.args and len(e.args) > 0 and isinstance(e.args[0], str) and 'timeout' in e.args[0].lower():
+                result['error'] = "No response received (timeout)"
+                return False
+            else:
+                result['error'] = f"USB error: {e}"
+                return False
+        
+        return True
+    
     def check_system_info(self):
         """Check system information for USB support"""
+        import platform
+        
         print("\nSystem Information:")
         print(f"  Operating System: {platform.system()} {platform.release()}")
         print(f"  Python Version: {platform.python_version()}")
@@ -287,12 +409,18 @@ class ConnectionTester:
         print(f"  USB Backend: {backend_name}")
         
         # Check permissions on Linux
-        if platform.system() == 'Linux':
+        if sys.platform.startswith('linux'):
             print("\nLinux USB Permissions:")
             try:
-                import subprocess
-                result = subprocess.run(['groups'], stdout=subprocess.PIPE, text=True)
-                groups = result.stdout.strip().split()
+                import grp
+                # Same list as the `groups` command, without starting a process
+                gids = [os.getegid()] + [gid for gid in os.getgroups() if gid != os.getegid()]
+                groups = []
+                for gid in gids:
+                    try:
+                        groups.append(grp.getgrgid(gid).gr_name)
+                    except KeyError:
+                        groups.append(str(gid))  # No group entry; `groups` prints the number too
                 print(f"  User Groups: {', '.join(groups)}")
                 if any(g in groups for g in ['lp', 'plugdev', 'uucp']):
                     print("  USB Access: Likely OK (user in relevant groups)")
@@ -335,32 +463,32 @@ class ConnectionTester:
             }
             
             if self.device:
-                try:
-                    if hasattr(self.device, 'iManufacturer') and self.device.iManufacturer:
-                        device_info["manufacturer"] = usb.util.get_string(self.device, self.device.iManufacturer)
-                    
-                    if hasattr(self.device, 'iProduct') and self.device.iProduct:
-                        device_info["product"] = usb.util.get_string(self.device, self.device.iProduct)
-                    
-                    if hasattr(self.device, 'iSerialNumber') and self.device.iSerialNumber:
-                        device_info["serial_number"] = usb.util.get_string(self.device, self.device.iSerialNumber)
-                except:
-                    pass
+                # Reuses the strings read by setup_connection
+                device_info.update(self._device_strings())
             
             # System information
+            import platform
             system_info = {
                 "os": f"{platform.system()} {platform.release()}",
                 "python_version": platform.python_version()
             }
             
-            import json
-            with open(filename, 'w') as f:
-                json.dump({
-                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "system_info": system_info,
-                    "device_info": device_info,
-                    "test_results": self.test_results
-                }, f, indent=2)
+            results = {
+                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "system_info": system_info,
+                "device_info": device_info,
+                "test_results": self.test_results
+            }
+            
+            try:
+                import orjson
+            except ImportError:
+                import json
+                with open(filename, 'w') as f:
+                    json.dump(results, f, indent=2)
+            else:
+                with open(filename, 'wb') as f:
+                    f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
                 
             print(f"\nTest results saved to {filename}")
             
@@ -390,7 +518,7 @@ def print_recommendations(success):
         print("6. On macOS: Check System Information > USB for device recognition")
         print("\nAfter resolving issues, run this test again.")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="InkCraft RIP Printer Connection Test")
     parser.add_argument("--vendor", type=lambda x: int(x, 0), default=EPSON_VENDOR_ID,
                       help="USB Vendor ID (default: 0x04B8 for Epson)")
@@ -400,11 +528,22 @@ def main():
                       help="Interface number (default: 0)")
     parser.add_argument("--pattern", choices=["BASIC", "STANDARD", "THOROUGH"], default="BASIC",
                       help="Test pattern to use (default: BASIC)")
+    parser.add_argument("--verbose", action="store_true",
+                      help="Read each printer's product string while finding printers")
+    parser.add_argument("--list", action="store_true",
+                      help="List every Epson device found, not just the selected one")
+    parser.add_argument("--batch", action="store_true",
+                      help="Send the whole test pattern in one USB write")
     parser.add_argument("--save", action="store_true",
                       help="Save test results to a file")
     parser.add_argument("--output", help="Output file for test results")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    if not PYUSB_AVAILABLE:
+        print("Error: PyUSB library not found.")
+        print("Please install it using: pip install pyusb")
+        return 1
     
     print("\n=== InkCraft RIP Printer Connection Test ===\n")
     
@@ -412,7 +551,9 @@ def main():
     tester = ConnectionTester(
         vendor_id=args.vendor,
         product_id=args.product,
-        interface_num=args.interface
+        interface_num=args.interface,
+        verbose=args.verbose,
+        list_devices=args.list
     )
     
     # Check system information
@@ -432,7 +573,7 @@ def main():
     
     # Run tests
     print("\nPrinter found and connected successfully.")
-    success = tester.run_tests(args.pattern)
+    success = tester.run_tests(args.pattern, batch=args.batch)
     
     # Save results if requested
     if args.save or args.output:
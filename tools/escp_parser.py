@@ -11,9 +11,33 @@ the reverse engineering process of the printer's communication protocol.
 
 import sys
 import os
+import re
 import json
+import struct
 import argparse
-from collections import defaultdict
+import importlib.util
+from array import array
+from datetime import datetime
+
+# numpy (for the --columns output) and dpkt are imported where used, so runs that
+# don't need them, and --help, skip their import time
+
+# ijson is optional; with it, captures are parsed one packet at a time instead of loaded whole
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# orjson is optional; it writes the parsed output much faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# dpkt is optional; with it, PCAP files are read in-process instead of through tshark
+DPKT_AVAILABLE = importlib.util.find_spec("dpkt") is not None
 
 # ESC/P Command Dictionary
 # Based on known ESC/P2 and ESC/POS commands, needs validation for DTG printers
@@ -41,51 +65,139 @@ ESCP_COMMANDS = {
     # Add more commands as discovered
 }
 
+# Stable small-integer code per known command, used for counting and by the columnar output
+COMMAND_CODES = {cmd: code for code, cmd in enumerate(ESCP_COMMANDS)}
+# Hex form and description of each command, indexed by code
+COMMAND_HEX = tuple(cmd.hex() for cmd in ESCP_COMMANDS)
+COMMAND_DESCRIPTIONS = tuple(ESCP_COMMANDS.values())
+_CODE_BY_HEX = {cmd_hex: code for code, cmd_hex in enumerate(COMMAND_HEX)}
+# Fields of the --columns output, one row per parsed command (a numpy dtype spec)
+COLUMN_DTYPE = [('packet', '<u4'), ('position', '<u4'), ('command', 'u1'), ('param_length', '<u2')]
+
 # Special command sequence markers
 ESC = b'\x1b'  # Escape character that typically starts ESC/P commands
 
+# One pattern for every known command, longest first so the longest match wins.
+# Each command starts with ESC, so the regex engine scans for that byte in C.
+# Every alternative is its own group; _GROUP_CODES maps match.lastindex to the code
+_PATTERN_COMMANDS = sorted(ESCP_COMMANDS, key=len, reverse=True)
+_COMMAND_PATTERN = re.compile(re.escape(ESC) + b'(?:' + b'|'.join(
+    b'(' + re.escape(cmd[1:]) + b')' for cmd in _PATTERN_COMMANDS) + b')')
+_GROUP_CODES = (None,) + tuple(COMMAND_CODES[cmd] for cmd in _PATTERN_COMMANDS)
+
+# Unknown commands are counted by the byte after ESC; a packet ending in ESC counts as NO_NEXT_BYTE
+NO_NEXT_BYTE = 256
+
+def _unknown_hex(index):
+    """Hex form of the unknown command counted at index"""
+    return ESC.hex() if index == NO_NEXT_BYTE else (ESC + bytes((index,))).hex()
+
+# Little-endian parameter length that follows ESC ( X commands
+_U16 = struct.Struct('<H')
+
+# PCAP link types that carry USB traffic
+LINKTYPE_USB_LINUX = 189          # usbmon, 48-byte header
+LINKTYPE_USB_LINUX_MMAPPED = 220  # usbmon, 64-byte header
+LINKTYPE_USBPCAP = 249            # USBPcap (Windows), header length in its first field
+USB_LINKTYPES = (LINKTYPE_USB_LINUX, LINKTYPE_USB_LINUX_MMAPPED, LINKTYPE_USBPCAP)
+
+def _usb_payload(linktype, buf):
+    """
+    Split a captured USB frame into its direction and transfer data
+    
+    Returns:
+        tuple: ("IN" or "OUT", data bytes), or None if the frame carries no data
+    """
+    if linktype == LINKTYPE_USBPCAP:
+        if len(buf) < 27:
+            return None
+        header_len = struct.unpack_from('<H', buf)[0]
+        endpoint = buf[21]
+        data = buf[header_len:]
+    else:
+        header_len = 48 if linktype == LINKTYPE_USB_LINUX else 64
+        if len(buf) < header_len:
+            return None
+        endpoint = buf[10]
+        captured = struct.unpack_from('<I', buf, 36)[0]
+        if linktype == LINKTYPE_USB_LINUX_MMAPPED and buf[9] == 0:
+            # Isochronous frames put their descriptors ahead of the data
+            header_len += 16 * struct.unpack_from('<I', buf, 60)[0]
+        data = buf[header_len:header_len + captured]
+        
+    if not data:
+        return None
+    return ("IN" if endpoint & 0x80 else "OUT"), data
+
+def _has_top_level_key(f, key):
+    """Whether the JSON object in file f has key at the top level (read with ijson)"""
+    for prefix, event, value in ijson.parse(f):
+        if prefix == '' and event == 'map_key' and value == key:
+            return True
+    return False
+
+def _json_bytes(obj):
+    """Encode obj as compact JSON, as UTF-8 bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
 class ESCPParser:
     def __init__(self):
-        self.commands_found = defaultdict(int)
+        self.commands_found = array('Q', [0]) * len(ESCP_COMMANDS)  # Count per command code
         self.parsed_data = []
-        self.unknown_commands = set()
+        self.unknown_commands = array('Q', [0]) * (NO_NEXT_BYTE + 1)  # Count per byte after ESC
+        self._stream = None  # Output file while streaming parsed entries
+        self._streamed = 0
         
     def parse_file(self, filename):
         """Parse a JSON file containing captured USB data"""
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-                
-            if 'packets' not in data:
-                print(f"Error: Invalid file format in {filename}")
-                return False
+            with open(filename, 'rb') as f:
+                if IJSON_AVAILABLE:
+                    # Stream one packet at a time instead of loading the whole capture.
+                    # Captures start with "packets", so the check usually stops at
+                    # the first key
+                    if not _has_top_level_key(f, 'packets'):
+                        print(f"Error: Invalid file format in {filename}")
+                        return False
+                    f.seek(0)
+                    packets = ijson.items(f, 'packets.item')
+                else:
+                    data = json.load(f)
+                    if 'packets' not in data:
+                        print(f"Error: Invalid file format in {filename}")
+                        return False
+                    packets = data['packets']
                 
-            # Process each packet
-            for packet in data['packets']:
-                if 'data' in packet:
-                    # If data is in hex string format, convert it to bytes
-                    if isinstance(packet['data'], str):
-                        try:
-                            # Handle space-separated hex format
-                            packet_data = bytes.fromhex(packet['data'].replace(' ', ''))
-                        except ValueError:
-                            print(f"Error: Could not parse hex data: {packet['data'][:50]}...")
+                # Process each packet
+                for packet in packets:
+                    # usb_capture files only keep the bytes as the 'hex' column
+                    raw = packet.get('data', packet.get('hex'))
+                    if raw is not None:
+                        # If data is in hex string format, convert it to bytes
+                        if isinstance(raw, str):
+                            try:
+                                # Handle space-separated hex format
+                                packet_data = bytes.fromhex(raw.replace(' ', ''))
+                            except ValueError:
+                                print(f"Error: Could not parse hex data: {raw[:50]}...")
+                                continue
+                        # If data is in list format (integers), convert to bytes
+                        elif isinstance(raw, list):
+                            packet_data = bytes(raw)
+                        else:
+                            print(f"Error: Unsupported data format: {type(raw)}")
                             continue
-                    # If data is in list format (integers), convert to bytes
-                    elif isinstance(packet['data'], list):
-                        packet_data = bytes(packet['data'])
-                    else:
-                        print(f"Error: Unsupported data format: {type(packet['data'])}")
-                        continue
                         
-                    parsed = self.parse_packet(packet_data)
-                    if parsed:
-                        parsed_entry = {
-                            "timestamp": packet.get('timestamp', ''),
-                            "direction": packet.get('direction', ''),
-                            "parsed_commands": parsed
-                        }
-                        self.parsed_data.append(parsed_entry)
+                        parsed = self.parse_packet(packet_data)
+                        if parsed:
+                            parsed_entry = {
+                                "timestamp": packet.get('timestamp', ''),
+                                "direction": packet.get('direction', ''),
+                                "parsed_commands": parsed
+                            }
+                            self._add_entry(parsed_entry)
             
             return True
                 
@@ -93,8 +205,19 @@ class ESCPParser:
             print(f"Error parsing file {filename}: {e}")
             return False
     
-    def parse_pcap(self, filename):
-        """Parse a PCAP file containing USB capture data (requires pyshark)"""
+    def parse_pcap(self, filename, use_pyshark=False):
+        """
+        Parse a PCAP file containing USB capture data
+        
+        Uses dpkt when it is installed, otherwise pyshark (which runs tshark).
+        
+        Args:
+            filename: PCAP or PCAPNG file
+            use_pyshark: Read the file through pyshark even if dpkt is available
+        """
+        if DPKT_AVAILABLE and not use_pyshark:
+            return self._parse_pcap_dpkt(filename)
+            
         try:
             import pyshark
         except ImportError:
@@ -103,7 +226,8 @@ class ESCPParser:
             return False
             
         try:
-            cap = pyshark.FileCapture(filename, display_filter='usb.data_fragment')
+            # Each packet is parsed once, so don't let pyshark hold on to them all
+            cap = pyshark.FileCapture(filename, display_filter='usb.data_fragment', keep_packets=False)
             
             for packet in cap:
                 if hasattr(packet, 'usb') and hasattr(packet.usb, 'data_fragment'):
@@ -117,7 +241,7 @@ class ESCPParser:
                             "direction": direction,
                             "parsed_commands": parsed
                         }
-                        self.parsed_data.append(parsed_entry)
+                        self._add_entry(parsed_entry)
             
             cap.close()
             return True
@@ -126,129 +250,297 @@ class ESCPParser:
             print(f"Error parsing PCAP file {filename}: {e}")
             return False
     
+    def _parse_pcap_dpkt(self, filename):
+        """Parse a PCAP file in-process with dpkt"""
+        import dpkt
+        
+        try:
+            with open(filename, 'rb') as f:
+                reader = dpkt.pcap.UniversalReader(f)
+                linktype = reader.datalink()
+                if linktype not in USB_LINKTYPES:
+                    print(f"Error: {filename} is not a USB capture (link type {linktype})")
+                    return False
+                    
+                for ts, buf in reader:
+                    usb = _usb_payload(linktype, buf)
+                    if usb is None:
+                        continue
+                    direction, packet_data = usb
+                    
+                    parsed = self.parse_packet(packet_data)
+                    if parsed:
+                        parsed_entry = {
+                            "timestamp": datetime.fromtimestamp(float(ts)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                            "direction": direction,
+                            "parsed_commands": parsed
+                        }
+                        self._add_entry(parsed_entry)
+            
+            return True
+                
+        except Exception as e:
+            print(f"Error parsing PCAP file {filename}: {e}")
+            return False
+    
     def parse_packet(self, data):
         """Parse a packet for ESC/P commands"""
         parsed_commands = []
+        length = len(data)
+        unpack_u16 = _U16.unpack_from
+        unknown = self.unknown_commands
         i = 0
         
-        while i < len(data):
-            # Look for ESC character
-            if data[i:i+1] == ESC:
-                # Try to match commands of different lengths
-                matched = False
-                for cmd_len in range(5, 1, -1):  # Try 5-char commands, then 4, 3, 2
-                    if i + cmd_len <= len(data):
-                        cmd = data[i:i+cmd_len]
-                        if cmd in ESCP_COMMANDS:
-                            # Extract parameter length for variable-length commands
-                            param_len = 0
-                            if cmd_len >= 3:  # Commands like ESC ( X n m
-                                if i + cmd_len + 1 < len(data):
-                                    param_len = data[i+cmd_len] + (data[i+cmd_len+1] * 256 if i+cmd_len+2 < len(data) else 0)
-                            
-                            # Extract parameters if present
-                            params = []
-                            if param_len > 0 and i + cmd_len + 2 + param_len <= len(data):
-                                params = data[i+cmd_len+2:i+cmd_len+2+param_len]
-                                
-                            cmd_info = {
-                                "position": i,
-                                "command": cmd.hex(),
-                                "description": ESCP_COMMANDS[cmd],
-                                "parameters": params.hex() if params else ""
-                            }
-                            parsed_commands.append(cmd_info)
-                            
-                            self.commands_found[cmd] += 1
-                            i += cmd_len + (param_len + 2 if param_len > 0 else 0)
-                            matched = True
-                            break
-                
-                # Try 2-character commands if no match yet
-                if not matched and i + 2 <= len(data):
-                    cmd = data[i:i+2]
-                    if cmd in ESCP_COMMANDS:
-                        # For simple commands like ESC @
-                        cmd_info = {
-                            "position": i,
-                            "command": cmd.hex(),
-                            "description": ESCP_COMMANDS[cmd],
-                            "parameters": ""
-                        }
-                        parsed_commands.append(cmd_info)
-                        
-                        self.commands_found[cmd] += 1
-                        i += 2
-                        matched = True
+        while True:
+            # Find the next known command in one scan instead of testing each ESC
+            match = _COMMAND_PATTERN.search(data, i)
+            end = match.start() if match else length
+            
+            # Every ESC before it starts an unknown command
+            esc_pos = data.find(ESC, i, end)
+            while esc_pos != -1:
+                unknown[data[esc_pos + 1] if esc_pos + 1 < length else NO_NEXT_BYTE] += 1
+                esc_pos = data.find(ESC, esc_pos + 1, end)
+            
+            if match is None:
+                break
+            
+            i = end
+            code = _GROUP_CODES[match.lastindex]
+            cmd_len = match.end() - i
+            
+            # Extract parameter length for variable-length commands
+            param_len = 0
+            if cmd_len >= 3 and i + cmd_len + 2 <= length:  # Commands like ESC ( X nL nH
+                param_len = unpack_u16(data, i + cmd_len)[0]
+            
+            # Extract parameters if present
+            params = []
+            if param_len > 0 and i + cmd_len + 2 + param_len <= length:
+                params = data[i+cmd_len+2:i+cmd_len+2+param_len]
                 
-                # If still no match, record as unknown command and continue
-                if not matched:
-                    # Try to capture complete unknown command
-                    unknown_cmd = data[i:i+2]
-                    self.unknown_commands.add(unknown_cmd)
-                    i += 1
-            else:
-                i += 1
+            cmd_info = {
+                "position": i,
+                "command": COMMAND_HEX[code],
+                "description": COMMAND_DESCRIPTIONS[code],
+                "parameters": params.hex() if params else ""
+            }
+            parsed_commands.append(cmd_info)
+            
+            self.commands_found[code] += 1
+            i += cmd_len + (param_len + 2 if param_len > 0 else 0)
                 
         return parsed_commands
     
+    def found_commands(self):
+        """Return (command code, count) for every command seen at least once"""
+        return [(code, count) for code, count in enumerate(self.commands_found) if count]
+    
+    def found_unknown_commands(self):
+        """Return the hex form of every distinct unknown command, in byte order"""
+        return [_unknown_hex(index) for index, count in enumerate(self.unknown_commands) if count]
+    
     def print_statistics(self):
         """Print statistics about parsed commands"""
         print("\nCommand Statistics:")
         print("-" * 50)
-        print(f"Total parsed command sequences: {sum(self.commands_found.values())}")
-        print(f"Unique command types: {len(self.commands_found)}")
-        print(f"Unknown command sequences: {len(self.unknown_commands)}")
+        print(f"Total parsed command sequences: {sum(self.commands_found)}")
+        found = self.found_commands()
+        print(f"Unique command types: {len(found)}")
+        unknown = self.found_unknown_commands()
+        print(f"Unknown command sequences: {len(unknown)}")
         
-        if self.commands_found:
+        if found:
             print("\nCommand Frequency:")
             print("-" * 50)
-            sorted_cmds = sorted(self.commands_found.items(), key=lambda x: x[1], reverse=True)
-            for cmd, count in sorted_cmds:
-                cmd_hex = cmd.hex()
-                description = ESCP_COMMANDS.get(cmd, "Unknown")
-                print(f"{cmd_hex:<10} : {count:<5} : {description}")
+            sorted_cmds = sorted(found, key=lambda x: x[1], reverse=True)
+            for code, count in sorted_cmds:
+                print(f"{COMMAND_HEX[code]:<10} : {count:<5} : {COMMAND_DESCRIPTIONS[code]}")
         
-        if self.unknown_commands:
+        if unknown:
             print("\nUnknown Commands (first 10):")
             print("-" * 50)
-            for i, cmd in enumerate(list(self.unknown_commands)[:10]):
-                print(f"{i+1}. {cmd.hex()}")
+            for i, cmd_hex in enumerate(unknown[:10]):
+                print(f"{i+1}. {cmd_hex}")
+    
+    def _add_entry(self, parsed_entry):
+        """Keep a parsed packet, or write it straight out when streaming"""
+        if self._stream is None:
+            self.parsed_data.append(parsed_entry)
+            return
+        if self._streamed:
+            self._stream.write(b', ')
+        self._stream.write(_json_bytes(parsed_entry))
+        self._streamed += 1
+    
+    def start_stream(self, output_filename):
+        """
+        Write parsed packets to output_filename as they are parsed
+        
+        parsed_data stays empty, so memory use no longer grows with the capture.
+        Call finish_stream() afterwards to add the statistics and close the file.
+        The column (.npy) output needs parsed_data and is not written this way.
+        """
+        try:
+            self._stream = open(output_filename, 'wb')
+            self._stream.write(b'{"parsed_data": [')
+            self._streamed = 0
+            return True
+        except OSError as e:
+            print(f"Error opening output file {output_filename}: {e}")
+            return False
+    
+    def finish_stream(self):
+        """
+        Write the statistics after the streamed packets and close the output
+        
+        Only call this after a successful parse; use abort_stream() otherwise.
+        """
+        if self._stream is None:
+            return False
+        
+        try:
+            self._stream.write(b'], "statistics": ')
+            self._stream.write(_json_bytes(self._statistics()))
+            self._stream.write(b', "unknown_commands": ')
+            self._stream.write(_json_bytes(self.found_unknown_commands()))
+            self._stream.write(b'}')
+            print(f"Parsed data saved to {self._stream.name}")
+            return True
+            
+        except Exception as e:
+            print(f"Error saving parsed data: {e}")
+            return False
+            
+        finally:
+            self._stream.close()
+            self._stream = None
+    
+    def abort_stream(self):
+        """Close and remove the streamed output, e.g. after a failed parse"""
+        if self._stream is None:
+            return
+        
+        self._stream.close()
+        try:
+            os.remove(self._stream.name)
+        except OSError as e:
+            print(f"Error removing partial output {self._stream.name}: {e}")
+        self._stream = None
+    
+    def _statistics(self):
+        """Summary counts for the JSON output"""
+        found = self.found_commands()
+        return {
+            "total_commands": sum(self.commands_found),
+            "unique_commands": len(found),
+            "unknown_commands": sum(1 for count in self.unknown_commands if count),
+            "command_frequency": {COMMAND_HEX[code]: count for code, count in found}
+        }
     
-    def save_parsed_data(self, output_filename):
-        """Save parsed data to a JSON file"""
+    def save_parsed_data(self, output_filename, columns=False):
+        """
+        Save parsed data to a JSON file
+        
+        With columns, the parsed commands are also saved next to it as
+        <output>.npy (see save_parsed_columns). A failure there is reported on
+        its own and does not undo the JSON output.
+        """
         if not self.parsed_data:
             print("No parsed data to save")
             return False
         
         try:
             output_data = {
-                "statistics": {
-                    "total_commands": sum(self.commands_found.values()),
-                    "unique_commands": len(self.commands_found),
-                    "unknown_commands": len(self.unknown_commands),
-                    "command_frequency": {cmd.hex(): count for cmd, count in self.commands_found.items()}
-                },
-                "unknown_commands": [cmd.hex() for cmd in self.unknown_commands],
+                "statistics": self._statistics(),
+                "unknown_commands": self.found_unknown_commands(),
                 "parsed_data": self.parsed_data
             }
             
-            with open(output_filename, 'w') as f:
-                json.dump(output_data, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(output_filename, 'wb') as f:
+                    f.write(orjson.dumps(output_data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(output_filename, 'w') as f:
+                    json.dump(output_data, f, indent=2)
                 
             print(f"Parsed data saved to {output_filename}")
-            return True
             
         except Exception as e:
             print(f"Error saving parsed data: {e}")
             return False
+        
+        if columns:
+            self.save_parsed_columns(os.path.splitext(output_filename)[0] + ".npy")
+        return True
+    
+    def save_parsed_columns(self, output_filename):
+        """
+        Save the parsed commands as one numpy structured array, a row per command
+        
+        The JSON output stays the human-readable record; this is the form for
+        analysis passes, which can filter and count with array masks instead of
+        walking a list of dicts. Load it with load_parsed_columns().
+        
+        Returns:
+            bool: True if the file was written, False otherwise
+        """
+        try:
+            import numpy as np
+            
+            count = sum(len(entry["parsed_commands"]) for entry in self.parsed_data)
+            rows = np.empty(count, dtype=COLUMN_DTYPE)
+            
+            row = 0
+            for packet_index, entry in enumerate(self.parsed_data):
+                for cmd_info in entry["parsed_commands"]:
+                    rows[row] = (packet_index,
+                                 cmd_info["position"],
+                                 _CODE_BY_HEX[cmd_info["command"]],
+                                 len(cmd_info["parameters"]) // 2)
+                    row += 1
+            
+            np.save(output_filename, rows)
+            print(f"Parsed columns saved to {output_filename}")
+            return True
+            
+        except Exception as e:
+            print(f"Error saving parsed columns: {e}")
+            return False
 
-def main():
+def load_parsed_columns(filename, mmap_mode='r'):
+    """
+    Load commands written by ESCPParser.save_parsed_columns
+    
+    The file is memory-mapped by default, so only the pages a pass touches are
+    read; pass mmap_mode=None to load it whole.
+    
+    Returns:
+        numpy structured array with COLUMN_DTYPE fields. "packet" indexes
+        parsed_data in the JSON output, and "command" indexes COMMAND_HEX
+        (command hex strings).
+    """
+    import numpy as np
+    
+    return np.load(filename, mmap_mode=mmap_mode)
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="ESC/P Command Parser for DTG Printer Analysis")
     parser.add_argument("input_file", help="Input file (JSON capture or PCAP file)")
     parser.add_argument("-o", "--output", help="Output JSON file for parsed commands")
-    parser.add_argument("-p", "--pcap", action="store_true", help="Input is a PCAP file (requires pyshark)")
-    args = parser.parse_args()
+    parser.add_argument("-p", "--pcap", action="store_true", help="Input is a PCAP file (requires dpkt or pyshark)")
+    parser.add_argument("--slow-pcap", action="store_true",
+                        help="Read PCAP files through pyshark/tshark even when dpkt is installed")
+    parser.add_argument("--stream-out", action="store_true",
+                        help="Write parsed packets to the output file as they are parsed (no --columns output)")
+    parser.add_argument("--columns", action="store_true",
+                        help="Also save the parsed commands as a numpy array next to the output (<output>.npy)")
+    args = parser.parse_args(argv)
+    
+    if args.stream_out and not args.output:
+        parser.error("--stream-out requires -o/--output")
+    if args.columns and (args.stream_out or not args.output):
+        parser.error("--columns requires -o/--output and cannot be used with --stream-out")
     
     if not os.path.isfile(args.input_file):
         print(f"Error: Input file '{args.input_file}' not found")
@@ -256,18 +548,30 @@ def main():
     
     escp_parser = ESCPParser()
     
-    if args.pcap:
-        success = escp_parser.parse_pcap(args.input_file)
-    else:
-        success = escp_parser.parse_file(args.input_file)
+    if args.stream_out and not escp_parser.start_stream(args.output):
+        return 1
+    
+    success = False
+    try:
+        if args.pcap:
+            success = escp_parser.parse_pcap(args.input_file, use_pyshark=args.slow_pcap)
+        else:
+            success = escp_parser.parse_file(args.input_file)
+    finally:
+        # A failed parse would leave a valid-looking but partial file
+        if args.stream_out:
+            if success:
+                escp_parser.finish_stream()
+            else:
+                escp_parser.abort_stream()
     
     if not success:
         return 1
     
     escp_parser.print_statistics()
     
-    if args.output:
-        escp_parser.save_parsed_data(args.output)
+    if args.output and not args.stream_out:
+        escp_parser.save_parsed_data(args.output, columns=args.columns)
     
     return 0
 
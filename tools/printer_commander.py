@@ -13,6 +13,7 @@ import os
 import time
 import argparse
 import json
+import struct
 import binascii
 from datetime import datetime
 
@@ -24,6 +25,17 @@ except ImportError:
     print("Please install it using: pip install pyusb")
     sys.exit(1)
 
+# python-libusb1 is optional; when present, bulk transfers go through it
+# instead of PyUSB, and send_commands keeps several writes queued instead of
+# waiting for each one to finish
+try:
+    import usb1
+    USB1_AVAILABLE = True
+    USB_ERRORS = (usb.core.USBError, usb1.USBError)
+except ImportError:
+    USB1_AVAILABLE = False
+    USB_ERRORS = (usb.core.USBError,)
+
 # Epson F2100/F2130 USB identifiers (same as in usb_capture.py)
 EPSON_VENDOR_ID = 0x04b8  # Epson vendor ID
 POSSIBLE_PRODUCT_IDS = [
@@ -37,15 +49,44 @@ INIT_PRINTER = b'\x1b@'              # ESC @ - Initialize printer
 SELECT_GRAPHICS = b'\x1b(G\x01\x00\x01'  # ESC ( G - Select graphics mode
 SELECT_COLOR = b'\x1b(K\x02\x00\x00\x01'  # ESC ( K - Set color (replace last byte for color)
 
+# FTDI USB-serial bridges hold IN data for their latency timer (16 ms by
+# default) before sending a short packet; setup_printer lowers it to 1 ms.
+# This only applies when talking to a printer through such a bridge (run with
+# --vendor 0x0403); Epson's own USB interface has no latency timer, so the
+# default path is unchanged
+FTDI_VENDOR_ID = 0x0403
+FTDI_SET_LATENCY_TIMER = 0x09  # Vendor request; wValue is the timer in ms
+FTDI_LATENCY_MS = 1
+
+# Binary command log record: Unix time, direction (LOG_DIRECTIONS index), data
+# length; the raw data follows. Read it back with read_binary_log()
+LOG_RECORD = struct.Struct('<dBI')
+LOG_DIRECTIONS = ("OUT", "IN")
+
+# _read_response asks for up to this many IN packets in one read
+RESPONSE_PACKETS = 64
+
+# Number of bulk OUT transfers kept in flight by send_commands
+ASYNC_TRANSFERS = 4
+# send_commands joins small commands into writes of up to this many OUT packets
+BATCH_PACKETS = 4
+
 class PrinterCommander:
-    def __init__(self, vendor_id=EPSON_VENDOR_ID, product_ids=POSSIBLE_PRODUCT_IDS):
+    def __init__(self, vendor_id=EPSON_VENDOR_ID, product_ids=POSSIBLE_PRODUCT_IDS, keep_log=True):
         self.vendor_id = vendor_id
         self.product_ids = product_ids
         self.device = None
         self.interface = None
         self.endpoint_in = None
         self.endpoint_out = None
+        self._in_address = None  # Endpoint addresses as plain ints, set by setup_printer
+        self._out_address = None
         self.command_log = []
+        self.keep_log = keep_log  # Keep entries in command_log; off when they only go to a log stream
+        self._log_stream = None  # File the log is streamed to, if any
+        self._log_binary = False  # Stream LOG_RECORD records instead of JSON lines
+        self._usb1_context = None
+        self._handle = None  # python-libusb1 handle for bulk transfers, set by setup_printer
         
     def find_printer(self):
         """Find the DTG printer connected via USB"""
@@ -93,6 +134,17 @@ class PrinterCommander:
             if not self.endpoint_in or not self.endpoint_out:
                 print("Could not find required endpoints")
                 return False
+            
+            # The send and read paths use these instead of the endpoint objects
+            self._in_address = self.endpoint_in.bEndpointAddress
+            self._out_address = self.endpoint_out.bEndpointAddress
+            
+            # Only FTDI bridges have the timer (never the case for --vendor 0x04b8)
+            if self.device.idVendor == FTDI_VENDOR_ID:
+                self._set_latency_timer()
+            
+            if USB1_AVAILABLE:
+                self._open_usb1()
                 
             print("Printer successfully initialized")
             return True
@@ -101,39 +153,109 @@ class PrinterCommander:
             print(f"Error setting up printer: {e}")
             return False
     
+    def _set_latency_timer(self):
+        """
+        Lower an FTDI bridge's latency timer so short responses arrive sooner
+        
+        FTDI only: the request is vendor-specific, and setup_printer sends it
+        only when the device's vendor is FTDI_VENDOR_ID.
+        """
+        try:
+            # wIndex is the FTDI port, numbered from 1
+            self.device.ctrl_transfer(0x40, FTDI_SET_LATENCY_TIMER, FTDI_LATENCY_MS,
+                                      self.interface.bInterfaceNumber + 1)
+            print(f"Latency timer set to {FTDI_LATENCY_MS} ms")
+        except usb.core.USBError as e:
+            print(f"Warning: Could not set latency timer: {e}")
+    
+    def _open_usb1(self):
+        """
+        Open the printer through python-libusb1 for bulk transfers
+        
+        libusb1 hands each transfer to libusb directly, without the argument
+        checks and array conversions PyUSB does in Python on every call. PyUSB
+        is still used to find and configure the device. If the device cannot
+        be opened this way, transfers stay on PyUSB.
+        """
+        interface_number = self.interface.bInterfaceNumber
+        context = None
+        handle = None
+        try:
+            usb1.loadLibrary()
+            context = usb1.USBContext()
+            context.open()
+            
+            # Open the same physical device PyUSB found
+            for dev in context.getDeviceIterator(skip_on_error=True):
+                if (dev.getBusNumber() == self.device.bus and
+                        dev.getDeviceAddress() == self.device.address):
+                    handle = dev.open()
+                    break
+            
+            if handle is None:
+                context.close()
+                return False
+            
+            usb.util.release_interface(self.device, interface_number)
+            handle.claimInterface(interface_number)
+        except (OSError,) + USB_ERRORS as e:
+            print(f"Using PyUSB for transfers ({e})")
+            if handle is not None:
+                handle.close()
+            if context is not None:
+                context.close()
+            return False
+        
+        self._usb1_context = context
+        self._handle = handle
+        return True
+    
+    def _bulk_write(self, data, timeout=1000):
+        """Write to the OUT endpoint and return the number of bytes written"""
+        if self._handle is not None:
+            return self._handle.bulkWrite(self._out_address, data, timeout)
+        return self.device.write(self._out_address, data, timeout=timeout)
+    
+    def _bulk_read(self, size, timeout):
+        """Read up to size bytes from the IN endpoint; returns None if nothing arrives in time"""
+        if self._handle is not None:
+            try:
+                return self._handle.bulkRead(self._in_address, size, timeout)
+            except usb1.USBErrorTimeout as e:
+                return e.received or None
+        
+        try:
+            return self.device.read(self._in_address, size, timeout=timeout)
+        except usb.core.USBError as e:
+            if e.args[0] == 'Operation timed out':
+                return None
+            raise
+    
     def send_command(self, command, read_response=True, response_timeout=1000):
         """Send a raw command to the printer"""
+        return self.send_command_raw(_command_bytes(command), read_response, response_timeout)
+    
+    def send_command_raw(self, command, read_response=True, response_timeout=1000, not_before=None):
+        """
+        Send a command that is already bytes, as from _command_bytes
+        
+        not_before is a time.monotonic() value; the write waits until then.
+        """
         if not self.endpoint_out:
             print("Printer not initialized")
             return False
         
-        # Ensure command is in bytes format
-        if isinstance(command, str):
-            if command.startswith('0x') or ' ' in command:
-                # Convert from hex string
-                command = bytes.fromhex(command.replace('0x', '').replace(' ', ''))
-            else:
-                # Convert from ASCII
-                command = command.encode()
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        _wait_until(not_before)
+        timestamp = time.time_ns()
         
         try:
             # Log the command
-            cmd_hex = ' '.join([f"{b:02x}" for b in command])
+            cmd_hex = memoryview(command).hex(' ')
             print(f"Sending: {cmd_hex}")
             
             # Send the command
-            bytes_written = self.device.write(self.endpoint_out.bEndpointAddress, command)
-            
-            cmd_log = {
-                "timestamp": timestamp,
-                "direction": "OUT",
-                "bytes_count": bytes_written,
-                "data_hex": cmd_hex,
-                "description": f"Sent {bytes_written} bytes"
-            }
-            self.command_log.append(cmd_log)
+            bytes_written = self._bulk_write(command)
+            self._log_command(timestamp, command, cmd_hex, bytes_written)
             
             # Read response if requested
             if read_response:
@@ -147,26 +269,195 @@ class PrinterCommander:
             print(f"Error sending command: {e}")
             return False
     
+    def send_commands(self, commands, timeout=1000, not_before=None):
+        """
+        Send commands back to back without reading responses
+        
+        Consecutive commands are joined into writes of up to BATCH_PACKETS OUT
+        packets, so a run of short commands costs one USB transfer instead of
+        one each. When setup_printer opened the device through python-libusb1,
+        up to ASYNC_TRANSFERS writes are queued at once, so the next write is
+        already submitted when one completes. Otherwise each write goes through
+        send_command_raw in turn.
+        
+        not_before is a time.monotonic() value the first write waits for.
+        
+        Returns:
+            int: Number of commands sent
+        """
+        if not self.endpoint_out:
+            print("Printer not initialized")
+            return 0
+        
+        writes = _batch_commands([_command_bytes(command) for command in commands],
+                                 BATCH_PACKETS * self.endpoint_out.wMaxPacketSize)
+        if self._handle is not None:
+            return self._send_async(writes, timeout, not_before)
+        
+        _wait_until(not_before)
+        return sum(count for data, count in writes if self.send_command_raw(data, read_response=False))
+    
+    def _send_async(self, writes, timeout, not_before=None):
+        """
+        Send writes with ASYNC_TRANSFERS bulk transfers queued at once
+        
+        Each completed transfer is logged and refilled with the next write
+        straight away. Requires the python-libusb1 handle from _open_usb1.
+        
+        Args:
+            writes: (data, command count) pairs, as from _batch_commands
+            timeout: Milliseconds allowed for each transfer
+            not_before: time.monotonic() value to wait for before the first write
+        
+        Returns:
+            int: Number of commands sent
+        """
+        context = self._usb1_context
+        handle = self._handle
+        endpoint = self._out_address
+        queue = iter(writes)
+        sent = 0
+        failed = False
+        
+        def submit_next(transfer):
+            write = next(queue, None)
+            if write is None:
+                return False
+            data, count = write
+            cmd_hex = memoryview(data).hex(' ')
+            print(f"Sending: {cmd_hex}")
+            timestamp = time.time_ns()
+            transfer.setBulk(endpoint, data, callback=on_complete, timeout=timeout,
+                             user_data=(timestamp, data, cmd_hex, count))
+            transfer.submit()
+            return True
+        
+        def on_complete(transfer):
+            nonlocal sent, failed
+            status = transfer.getStatus()
+            if status != usb1.TRANSFER_COMPLETED:
+                if status != usb1.TRANSFER_CANCELLED:
+                    print(f"Error sending command: transfer failed with status {status}")
+                failed = True
+                return
+            
+            timestamp, data, cmd_hex, count = transfer.getUserData()
+            self._log_command(timestamp, data, cmd_hex, transfer.getActualLength())
+            sent += count
+            if not failed:
+                submit_next(transfer)
+        
+        transfers = []
+        try:
+            _wait_until(not_before)
+            for _ in range(ASYNC_TRANSFERS):
+                transfer = handle.getTransfer()
+                transfers.append(transfer)
+                if not submit_next(transfer):
+                    break
+            
+            while any(t.isSubmitted() for t in transfers):
+                context.handleEventsTimeout(0.1)
+                
+        finally:
+            # Cancel whatever is still queued (e.g. on Ctrl+C) and wait for it
+            failed = True
+            try:
+                for transfer in transfers:
+                    if transfer.isSubmitted():
+                        try:
+                            transfer.cancel()
+                        except usb1.USBError:
+                            pass
+                while any(t.isSubmitted() for t in transfers):
+                    context.handleEventsTimeout(0.1)
+            finally:
+                # Free each transfer's libusb allocation now rather than when the
+                # handle closes; one still in flight is left to the handle
+                for transfer in transfers:
+                    if not transfer.isSubmitted():
+                        transfer.close()
+        
+        return sent
+    
+    def _log_command(self, timestamp, command, cmd_hex, bytes_written):
+        """Add a sent command to the command log"""
+        self._add_log_entry({
+            "timestamp": timestamp,
+            "direction": "OUT",
+            "bytes_count": bytes_written,
+            "data_hex": cmd_hex,
+            "description": f"Sent {bytes_written} bytes"
+        }, command)
+    
+    def _add_log_entry(self, entry, data):
+        """
+        Keep a log entry, and write it out straight away when streaming
+        
+        entry["timestamp"] is a time.time_ns() value; it is only turned into
+        text when the entry is written as JSON.
+        """
+        if self._log_stream is not None:
+            if self._log_binary:
+                self._log_stream.write(LOG_RECORD.pack(entry["timestamp"] / 1e9,
+                                                       LOG_DIRECTIONS.index(entry["direction"]), len(data)))
+                self._log_stream.write(data)
+            else:
+                self._log_stream.write(json.dumps(_formatted_entry(entry), separators=(',', ':')) + '\n')
+        if self.keep_log:
+            self.command_log.append(entry)
+    
+    def start_log_stream(self, filename, binary=False):
+        """
+        Append every log entry to filename as it is logged
+        
+        By default each entry is one JSON line, and the file is line buffered
+        so it can be followed while commands run. With binary, each entry is a
+        LOG_RECORD header and the raw bytes, about a third of the size of the
+        hex text; read it back with read_binary_log().
+        Entries are only kept in command_log as well if keep_log is set.
+        """
+        try:
+            if binary:
+                self._log_stream = open(filename, 'ab')
+            else:
+                self._log_stream = open(filename, 'a', buffering=1)
+            self._log_binary = binary
+            return True
+        except OSError as e:
+            print(f"Error opening log file {filename}: {e}")
+            return False
+    
+    def finish_log_stream(self):
+        """Close the log stream, if one is open"""
+        if self._log_stream is not None:
+            print(f"Command log written to {self._log_stream.name}")
+            self._log_stream.close()
+            self._log_stream = None
+    
     def _read_response(self, timeout=1000, max_reads=5):
         """Read response from the printer"""
         if not self.endpoint_in:
             return None
         
         responses = []
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+        read_size = RESPONSE_PACKETS * self.endpoint_in.wMaxPacketSize
         
         try:
-            # Try reading multiple times if needed
+            # A read ends at the short packet that ends the printer's response,
+            # so one read is normally enough; only a read that fills the whole
+            # buffer can have more data behind it
             for _ in range(max_reads):
                 try:
-                    response = self.device.read(
-                        self.endpoint_in.bEndpointAddress,
-                        self.endpoint_in.wMaxPacketSize,
-                        timeout=timeout
-                    )
+                    response = self._bulk_read(read_size, timeout)
+                    timestamp = time.time_ns()
+                    
+                    # Timeout is normal after getting all data
+                    if response is None:
+                        break
                     
                     if response:
-                        resp_hex = ' '.join([f"{b:02x}" for b in response])
+                        resp_hex = memoryview(response).hex(' ')
                         print(f"Response: {resp_hex}")
                         
                         resp_log = {
@@ -176,16 +467,16 @@ class PrinterCommander:
                             "data_hex": resp_hex,
                             "description": f"Received {len(response)} bytes"
                         }
-                        self.command_log.append(resp_log)
+                        self._add_log_entry(resp_log, response)
                         responses.append(response)
-                        
-                        # Short timeout for additional data
-                        timeout = 100
-                        
-                except usb.core.USBError as e:
-                    # Timeout is normal after getting all data
-                    if e.args[0] == 'Operation timed out':
+                    
+                    if len(response) < read_size:
                         break
+                    
+                    # Short timeout for additional data
+                    timeout = 100
+                        
+                except USB_ERRORS as e:
                     print(f"USB Error: {e}")
                     break
             
@@ -205,34 +496,60 @@ class PrinterCommander:
                 print(f"Error: Expected a list of commands in {filename}")
                 return False
             
-            success_count = 0
+            # Convert every command before sending any, so a bad entry stops the
+            # run up front instead of partway through
+            steps = []
             for i, cmd in enumerate(commands):
-                print(f"\nExecuting command {i+1}/{len(commands)}")
+                try:
+                    if isinstance(cmd, dict):
+                        command_data = cmd.get('command', '')
+                        steps.append((_command_bytes(command_data) if command_data else None,
+                                      cmd.get('delay', 0), cmd.get('description', ''),
+                                      cmd.get('read_response', True)))
+                    else:
+                        steps.append((_command_bytes(cmd), 0, '', True))
+                except ValueError as e:
+                    print(f"Error: Invalid command {i+1} in {filename}: {e}")
+                    return False
+            
+            success_count = 0
+            queued = []  # Commands that don't read a response, sent together with send_commands
+            resume_at = None  # End of the last command's delay, as a time.monotonic() value
+            for i, (command_data, delay, description, read_response) in enumerate(steps):
+                print(f"\nExecuting command {i+1}/{len(steps)}")
                 
-                # Get command data
-                if isinstance(cmd, dict):
-                    command_data = cmd.get('command', '')
-                    delay = cmd.get('delay', 0)
-                    description = cmd.get('description', '')
+                if description:
+                    print(f"Description: {description}")
                     
-                    if description:
-                        print(f"Description: {description}")
-                        
-                    if not command_data:
-                        print("Warning: Empty command, skipping")
+                if command_data is None:
+                    print("Warning: Empty command, skipping")
+                    continue
+                
+                if not read_response:
+                    # Queue it, and send the queue before a delay
+                    queued.append(command_data)
+                    if delay <= 0:
                         continue
+                    success_count += self.send_commands(queued, not_before=resume_at)
+                    queued = []
                 else:
-                    command_data = cmd
-                    delay = 0
-                
-                # Send the command
-                if self.send_command(command_data):
-                    success_count += 1
+                    if queued:
+                        success_count += self.send_commands(queued, not_before=resume_at)
+                        queued = []
+                    if self.send_command_raw(command_data, not_before=resume_at):
+                        success_count += 1
+                resume_at = None
                 
-                # Delay if specified
+                # Delay if specified; the next send waits out what is left of it,
+                # so preparing that send doesn't add to the delay
                 if delay > 0:
                     print(f"Waiting {delay} ms...")
-                    time.sleep(delay / 1000)
+                    resume_at = time.monotonic() + delay / 1000
+            
+            if queued:
+                success_count += self.send_commands(queued, not_before=resume_at)
+            else:
+                _wait_until(resume_at)
             
             print(f"\nCommand execution complete. {success_count}/{len(commands)} successful.")
             return success_count > 0
@@ -258,7 +575,7 @@ class PrinterCommander:
                         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                         "command_count": len(self.command_log)
                     },
-                    "commands": self.command_log
+                    "commands": [_formatted_entry(entry) for entry in self.command_log]
                 }, f, indent=2)
                 
             print(f"Command log saved to {filename}")
@@ -288,6 +605,16 @@ class PrinterCommander:
     
     def close(self):
         """Release the USB device"""
+        if self._handle is not None:
+            try:
+                self._handle.releaseInterface(self.interface.bInterfaceNumber)
+                self._handle.close()
+                self._usb1_context.close()
+            except usb1.USBError as e:
+                print(f"Error closing device: {e}")
+            self._handle = None
+            self._usb1_context = None
+        
         if self.device:
             try:
                 usb.util.release_interface(self.device, self.interface.bInterfaceNumber)
@@ -302,6 +629,74 @@ class PrinterCommander:
             except Exception as e:
                 print(f"Error closing device: {e}")
 
+def _formatted_entry(entry):
+    """Return a copy of a log entry with its time.time_ns() timestamp as local time text"""
+    seconds, nanoseconds = divmod(entry["timestamp"], 1_000_000_000)
+    timestamp = datetime.fromtimestamp(seconds).replace(microsecond=nanoseconds // 1000)
+    return {**entry, "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")}
+
+def _command_bytes(command):
+    """Return a command as bytes; strings are hex if they contain '0x' or spaces, else ASCII"""
+    if isinstance(command, str):
+        if command.startswith('0x') or ' ' in command:
+            # Convert from hex string
+            return bytes.fromhex(command.replace('0x', '').replace(' ', ''))
+        # Convert from ASCII
+        return command.encode()
+    return command
+
+def read_binary_log(filename):
+    """
+    Read a command log written with start_log_stream(binary=True)
+    
+    Yields:
+        dict: "time" (Unix time), "direction" ("OUT" or "IN") and "data" (bytes)
+    """
+    with open(filename, 'rb') as f:
+        while True:
+            header = f.read(LOG_RECORD.size)
+            if len(header) < LOG_RECORD.size:
+                return
+            timestamp, direction, length = LOG_RECORD.unpack(header)
+            yield {"time": timestamp, "direction": LOG_DIRECTIONS[direction], "data": f.read(length)}
+
+def _command_arg(text):
+    """argparse type for --command: the command as bytes, converted once"""
+    try:
+        return _command_bytes(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid command {text!r}: {e}")
+
+def _wait_until(deadline):
+    """Sleep until the time.monotonic() deadline, if one is given and not yet reached"""
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+def _batch_commands(commands, limit):
+    """
+    Join consecutive commands into writes of at most limit bytes
+    
+    A command longer than limit is written on its own.
+    
+    Returns:
+        list: (data, number of commands in data) pairs, in order
+    """
+    writes = []
+    batch = bytearray()
+    count = 0
+    for command in commands:
+        if count and len(batch) + len(command) > limit:
+            writes.append((bytes(batch), count))
+            batch.clear()
+            count = 0
+        batch += command
+        count += 1
+    if count:
+        writes.append((bytes(batch), count))
+    return writes
+
 def print_help_examples():
     """Print examples of how to use the tool"""
     print("\nExamples:")
@@ -328,11 +723,44 @@ def print_help_examples():
       "command": "1b 28 47 01 00 01",
       "description": "Enter graphics mode",
       "delay": 100
+    },
+    {
+      "command": "1b 28 4b 02 00 00 01",
+      "description": "Set color (sent without waiting for a response)",
+      "read_response": false
     }
   ]""")
+    print()
+    print("Consecutive commands with \"read_response\": false are joined into as few")
+    print("USB writes as possible, with several writes queued at once when")
+    print("python-libusb1 is installed.")
 
 def interactive_mode(commander):
     """Interactive command mode"""
+    try:
+        import readline  # noqa: F401 - gives input() line editing and history
+    except ImportError:
+        pass
+    
+    def show_help():
+        print("\nCommands:")
+        print("  hex_value  - Send hex bytes (e.g., '1b 40')")
+        print("  init       - Initialize printer")
+        print("  log        - Save command log")
+        print("  exit/quit  - Exit interactive mode")
+    
+    def save_log():
+        if commander.keep_log:
+            commander.save_log()
+        else:
+            print(f"Command log is being written to {commander._log_stream.name}")
+    
+    keywords = {
+        'help': show_help,
+        'init': commander.initialize_printer,
+        'log': save_log,
+    }
+    
     print("\nEntering interactive mode. Type 'exit' to quit, 'help' for help.")
     
     while True:
@@ -341,24 +769,14 @@ def interactive_mode(commander):
             
             if not cmd:
                 continue
-                
-            if cmd.lower() == 'exit' or cmd.lower() == 'quit':
+            
+            keyword = cmd.lower()
+            if keyword in ('exit', 'quit'):
                 break
-                
-            if cmd.lower() == 'help':
-                print("\nCommands:")
-                print("  hex_value  - Send hex bytes (e.g., '1b 40')")
-                print("  init       - Initialize printer")
-                print("  log        - Save command log")
-                print("  exit/quit  - Exit interactive mode")
-                continue
-                
-            if cmd.lower() == 'init':
-                commander.initialize_printer()
-                continue
-                
-            if cmd.lower() == 'log':
-                commander.save_log()
+            
+            handler = keywords.get(keyword)
+            if handler is not None:
+                handler()
                 continue
                 
             # Default: treat as hex command
@@ -371,64 +789,74 @@ def interactive_mode(commander):
         except Exception as e:
             print(f"Error: {e}")
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="DTG Printer Command Utility")
     group = parser.add_mutually_exclusive_group()
-    group.add_argument("-c", "--command", help="Hex command to send (e.g., '1b 40')")
+    group.add_argument("-c", "--command", type=_command_arg, help="Hex command to send (e.g., '1b 40')")
     group.add_argument("-f", "--file", help="JSON file containing commands to run")
     group.add_argument("-i", "--interactive", action="store_true", help="Enter interactive mode")
     
     parser.add_argument("--init", action="store_true", help="Initialize printer before sending commands")
-    parser.add_argument("--log", help="Save command log to specified file")
+    parser.add_argument("--log", help="Write the command log to this file as commands are sent")
+    parser.add_argument("--log-format", choices=["json", "binary"], default="json",
+                      help="--log file format: JSON lines, or raw data records (see read_binary_log)")
+    parser.add_argument("--keep-log-in-memory", action="store_true",
+                      help="With --log, also keep the log in memory (for the interactive 'log' command)")
     parser.add_argument("--vendor", type=lambda x: int(x, 0), default=EPSON_VENDOR_ID,
                       help="USB Vendor ID (default: 0x04b8 for Epson)")
     parser.add_argument("--product", type=lambda x: int(x, 0), 
                       help="USB Product ID (will try known IDs if not specified)")
     
-    args = parser.parse_args()
+    if argv is None:
+        argv = sys.argv[1:]
+    args = parser.parse_args(argv)
     
     # Show help if no arguments
-    if len(sys.argv) == 1:
+    if not argv:
         parser.print_help()
         print_help_examples()
         return 0
     
     # Setup printer commander
+    keep_log = not args.log or args.keep_log_in_memory
     if args.product:
-        commander = PrinterCommander(vendor_id=args.vendor, product_ids=[args.product])
+        commander = PrinterCommander(vendor_id=args.vendor, product_ids=[args.product], keep_log=keep_log)
     else:
-        commander = PrinterCommander(vendor_id=args.vendor)
+        commander = PrinterCommander(vendor_id=args.vendor, keep_log=keep_log)
     
-    # Find and setup printer
-    if not commander.find_printer():
+    if args.log and not commander.start_log_stream(args.log, binary=args.log_format == "binary"):
         return 1
-        
-    if not commander.setup_printer():
-        return 1
-    
-    # Initialize printer if requested
-    if args.init:
-        if not commander.initialize_printer():
-            return 1
     
     try:
-        # Process command, file, or interactive mode
-        if args.command:
-            commander.send_command(args.command)
-            
-        elif args.file:
-            commander.run_command_file(args.file)
+        # Find and setup printer
+        if not commander.find_printer():
+            return 1
             
-        elif args.interactive:
-            interactive_mode(commander)
+        if not commander.setup_printer():
+            return 1
         
-        # Save log if requested
-        if args.log:
-            commander.save_log(args.log)
+        # Initialize printer if requested
+        if args.init:
+            if not commander.initialize_printer():
+                return 1
         
+        try:
+            # Process command, file, or interactive mode
+            if args.command:
+                commander.send_command_raw(args.command)
+                
+            elif args.file:
+                commander.run_command_file(args.file)
+                
+            elif args.interactive:
+                interactive_mode(commander)
+            
+        finally:
+            # Always close the connection
+            commander.close()
+    
     finally:
-        # Always close the connection
-        commander.close()
+        commander.finish_log_stream()
     
     return 0
 
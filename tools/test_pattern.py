@@ -10,6 +10,7 @@ verifying print quality.
 import os
 import sys
 import argparse
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 import numpy as np
 
@@ -23,6 +24,26 @@ PATTERNS = {
     "alignment": "Alignment - Pattern for print alignment"
 }
 
+@lru_cache(maxsize=None)
+def _load_font(size):
+    """Load the drawing font at one size; each size is only opened and parsed once"""
+    try:
+        # Try to load a nice font if available
+        return ImageFont.truetype("arial.ttf", size)
+    except IOError:
+        # Fall back to default font
+        return ImageFont.load_default()
+
+def _line_extent(width):
+    """
+    Pixels a left-to-right or top-to-bottom draw.line of this width covers
+    on either side of its centre
+    
+    Returns:
+        tuple: (before, after); the line through y covers rows y - before to y + after
+    """
+    return (width - 1) // 2, width // 2
+
 class TestPatternGenerator:
     """Test pattern generator for printer testing"""
     
@@ -39,14 +60,15 @@ class TestPatternGenerator:
         
         options = options or {}
         
-        # Create a new image
+        # Create a new image; a pattern that paints every pixel gets it unfilled
+        covered = self._covers_image(pattern_type, options)
         if pattern_type == "colorbar":
             # Color bars are always RGB
-            img = Image.new('RGB', self.size, color=(255, 255, 255))
+            img = Image.new('RGB', self.size, color=None if covered else (255, 255, 255))
         else:
             # Other patterns can be grayscale
             color_mode = options.get('color_mode', 'L')
-            img = Image.new(color_mode, self.size, color=255)
+            img = Image.new(color_mode, self.size, color=None if covered else 255)
         
         # Generate the selected pattern
         pattern_method = getattr(self, f"_generate_{pattern_type}")
@@ -59,6 +81,17 @@ class TestPatternGenerator:
         
         return img
     
+    def _covers_image(self, pattern_type, options):
+        """Whether the pattern overwrites every pixel, so the white fill can be skipped"""
+        if pattern_type == "gradient":
+            return True
+        if pattern_type == "colorbar":
+            # Bar rectangles include their bottom row, so the last one ends at
+            # bar_count * bar_height
+            bar_count = options.get('bar_count', 4)
+            return bar_count * (self.size[1] // bar_count) >= self.size[1] - 1
+        return False
+    
     def _generate_grid(self, img, options):
         """Generate a grid pattern"""
         draw = ImageDraw.Draw(img)
@@ -68,13 +101,18 @@ class TestPatternGenerator:
         spacing = options.get('spacing', 100)
         color = options.get('color', 0)  # Black for grayscale
         
+        # Grid lines are axis-aligned, so fill each as a rectangle instead of
+        # drawing it as a wide line (a polygon in ImageDraw)
+        before, after = _line_extent(line_width)
+        right, bottom = self.size[0] - 1, self.size[1] - 1
+        
         # Draw horizontal lines
         for y in range(0, self.size[1], spacing):
-            draw.line([(0, y), (self.size[0], y)], fill=color, width=line_width)
+            draw.rectangle([0, y - before, right, y + after], fill=color)
         
         # Draw vertical lines
         for x in range(0, self.size[0], spacing):
-            draw.line([(x, 0), (x, self.size[1])], fill=color, width=line_width)
+            draw.rectangle([x - before, 0, x + after, bottom], fill=color)
         
         # Add grid measurements
         if options.get('show_measurements', True):
@@ -105,16 +143,19 @@ class TestPatternGenerator:
             (0, 0, 0)         # Black
         ]
         
+        color_names = ["CYAN", "MAGENTA", "YELLOW", "BLACK"]
+        font = self._get_font(36)
+        
         # Draw color bars
         for i in range(bar_count):
             y1 = i * bar_height
             y2 = (i + 1) * bar_height
             color_idx = i % len(colors)
-            draw.rectangle([0, y1, self.size[0], y2], fill=colors[color_idx])
+            # A solid-colour paste is a plain fill; the box covers rows y1 to y2
+            # inclusive, as the rectangle it replaces did
+            img.paste(colors[color_idx], (0, y1, self.size[0], min(y2 + 1, self.size[1])))
             
             # Add color name
-            font = self._get_font(36)
-            color_names = ["CYAN", "MAGENTA", "YELLOW", "BLACK"]
             text_color = (255, 255, 255) if color_idx == 3 else (0, 0, 0)  # White text on black
             
             text_x = self.size[0] // 2
@@ -126,23 +167,24 @@ class TestPatternGenerator:
         # Options
         direction = options.get('direction', 'horizontal')
         
-        # Create gradient array
+        # One row or column of the ramp; broadcasting repeats it without a copy
+        width, height = self.size
         if direction == 'horizontal':
-            gradient = np.linspace(0, 255, self.size[0], dtype=np.uint8)
-            gradient = np.tile(gradient, (self.size[1], 1))
+            ramp = np.linspace(0, 255, width, dtype=np.uint8)
         else:  # vertical
-            gradient = np.linspace(0, 255, self.size[1], dtype=np.uint8)
-            gradient = np.tile(gradient.reshape(-1, 1), (1, self.size[0]))
-        
-        # Convert to image
-        gradient_img = Image.fromarray(gradient)
+            ramp = np.linspace(0, 255, height, dtype=np.uint8).reshape(-1, 1)
         
-        # Paste into the image
         if img.mode == 'RGB':
-            # For RGB, we'll create a grayscale gradient
-            img.paste(gradient_img.convert('RGB'))
+            # Grayscale gradient in all three channels
+            gradient = np.broadcast_to(ramp[..., np.newaxis], (height, width, 3))
+        elif img.mode == 'L':
+            gradient = np.broadcast_to(ramp, (height, width))
         else:
-            img.paste(gradient_img)
+            img.paste(Image.fromarray(np.ascontiguousarray(np.broadcast_to(ramp, (height, width)))))
+            return
+        
+        # Write the pixels straight into the image; the contiguous copy is the only temporary
+        img.frombytes(np.ascontiguousarray(gradient))
     
     def _generate_resolution(self, img, options):
         """Generate a resolution test pattern"""
@@ -158,13 +200,15 @@ class TestPatternGenerator:
         line_count = (max_width - min_width) // step + 1
         pattern_height = self.size[1] // line_count
         
-        # Draw horizontal lines of increasing width
+        # Draw horizontal lines of increasing width, filled as rectangles like the grid lines
+        font = self._get_font(16)
+        right = self.size[0] - 1
         for i, width in enumerate(range(min_width, max_width + 1, step)):
             y = i * pattern_height + pattern_height // 2
-            draw.line([(0, y), (self.size[0], y)], fill=color, width=width)
+            before, after = _line_extent(width)
+            draw.rectangle([0, y - before, right, y + after], fill=color)
             
             # Add width label
-            font = self._get_font(16)
             draw.text((10, y - 10), f"{width}px", fill=color, font=font)
     
     def _generate_text(self, img, options):
@@ -214,33 +258,27 @@ class TestPatternGenerator:
         center_x, center_y = self.size[0] // 2, self.size[1] // 2
         line_length = min(self.size) // 3
         
-        # Center crosshair
-        draw.line([(center_x, center_y - line_length), 
-                  (center_x, center_y + line_length)], fill=color, width=2)
-        draw.line([(center_x - line_length, center_y), 
-                  (center_x + line_length, center_y)], fill=color, width=2)
-        
-        # Corner crosshairs - top left
-        draw.line([(50, 50), (50, 50 + line_length//2)], fill=color, width=2)
-        draw.line([(50, 50), (50 + line_length//2, 50)], fill=color, width=2)
-        
-        # Corner crosshairs - top right
-        draw.line([(self.size[0] - 50, 50), 
-                  (self.size[0] - 50, 50 + line_length//2)], fill=color, width=2)
-        draw.line([(self.size[0] - 50, 50), 
-                  (self.size[0] - 50 - line_length//2, 50)], fill=color, width=2)
-        
-        # Corner crosshairs - bottom left
-        draw.line([(50, self.size[1] - 50), 
-                  (50, self.size[1] - 50 - line_length//2)], fill=color, width=2)
-        draw.line([(50, self.size[1] - 50), 
-                  (50 + line_length//2, self.size[1] - 50)], fill=color, width=2)
-        
-        # Corner crosshairs - bottom right
-        draw.line([(self.size[0] - 50, self.size[1] - 50), 
-                  (self.size[0] - 50, self.size[1] - 50 - line_length//2)], fill=color, width=2)
-        draw.line([(self.size[0] - 50, self.size[1] - 50), 
-                  (self.size[0] - 50 - line_length//2, self.size[1] - 50)], fill=color, width=2)
+        arm = line_length // 2
+        left, top = 50, 50
+        right, bottom = self.size[0] - 50, self.size[1] - 50
+        
+        segments = [
+            # Center crosshair
+            ((center_x, center_y - line_length), (center_x, center_y + line_length)),
+            ((center_x - line_length, center_y), (center_x + line_length, center_y)),
+            # Corner crosshairs, each drawn outward from its corner
+            ((left, top), (left, top + arm)),
+            ((left, top), (left + arm, top)),
+            ((right, top), (right, top + arm)),
+            ((right, top), (right - arm, top)),
+            ((left, bottom), (left, bottom - arm)),
+            ((left, bottom), (left + arm, bottom)),
+            ((right, bottom), (right, bottom - arm)),
+            ((right, bottom), (right - arm, bottom)),
+        ]
+        line = draw.line
+        for start, end in segments:
+            line([start, end], fill=color, width=2)
         
         # Draw border
         draw.rectangle([10, 10, self.size[0] - 10, self.size[1] - 10], 
@@ -255,12 +293,7 @@ class TestPatternGenerator:
     
     def _get_font(self, size):
         """Get a font for drawing text"""
-        try:
-            # Try to load a nice font if available
-            return ImageFont.truetype("arial.ttf", size)
-        except IOError:
-            # Fall back to default font
-            return ImageFont.load_default()
+        return _load_font(size)
     
     def _draw_paragraph(self, draw, text, position, width, font, color):
         """Draw a paragraph of text with word wrapping"""
@@ -269,14 +302,15 @@ class TestPatternGenerator:
         current_line = []
         current_width = 0
         
+        # Measure on the font directly, and the trailing space only once
+        getlength = getattr(font, 'getlength', None)
+        if getlength is None:
+            # Older Pillow versions
+            getlength = lambda text: font.getsize(text)[0]
+        space_width = getlength(" ")
+        
         for word in words:
-            # Handle Pillow version compatibility for text width calculation
-            try:
-                # Use textlength for newer Pillow versions
-                word_width = draw.textlength(word + " ", font=font)
-            except AttributeError:
-                # Fallback for older Pillow versions
-                word_width = font.getsize(word + " ")[0]
+            word_width = getlength(word) + space_width
             
             if current_width + word_width <= width:
                 current_line.append(word)
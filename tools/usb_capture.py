@@ -22,6 +22,8 @@ import os
 import time
 import argparse
 import json
+import queue
+import threading
 from datetime import datetime
 
 # Try to import pyshark for packet analysis
@@ -42,6 +44,21 @@ except ImportError:
         print("    sudo apt-get install wireshark tshark")
     PYSHARK_AVAILABLE = False
 
+# python-libusb1 is optional; when present, capture keeps several bulk
+# transfers queued instead of issuing one blocking read at a time
+try:
+    import usb1
+    USB1_AVAILABLE = True
+except ImportError:
+    USB1_AVAILABLE = False
+
+# orjson is optional; it encodes captured packets much faster than json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Handle USB module imports with proper error handling and backend verification
 try:
     import usb
@@ -108,6 +125,37 @@ POSSIBLE_PRODUCT_IDS = [
     # Add more potential product IDs
 ]
 
+# Number of bulk IN transfers kept in flight during asynchronous capture
+ASYNC_TRANSFERS = 8
+
+# Default bytes asked for by each bulk IN read during capture. A read still
+# returns at the device's first short packet, so this only caps how much one
+# read can collect; larger reads mean fewer round trips for the same data
+READ_SIZE = 64 * 1024
+
+# Buffer size of the capture file; packets are a few hundred bytes of JSON
+# each, so this turns hundreds of small writes into one system call
+CAPTURE_WRITE_BUFFER = 64 * 1024
+
+# Packets captured but not yet formatted; when the formatter falls this far
+# behind, capture waits for it instead of holding ever more packets in memory
+FORMAT_QUEUE_SIZE = 4096
+
+# Known ESC/P commands that analyze_packet labels, keyed by the byte after ESC,
+# and for ESC ( commands by the byte after the '('
+ESC_COMMANDS = {
+    ord('@'): 'ESC @ (Initialize printer)',
+}
+ESC_PAREN_COMMANDS = {
+    ord('G'): 'ESC ( G (Graphics mode)',
+    ord('U'): 'ESC ( U (Set unit)',
+    ord('K'): 'ESC ( K (Set color)',
+    ord('i'): 'ESC ( i (Set ink)',
+}
+
+# bytes.translate table for the "ascii" column: printable ASCII stays, the rest becomes '.'
+PRINTABLE_ASCII = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+
 class USBPrinterAnalyzer:
     def __init__(self, vendor_id=EPSON_VENDOR_ID, product_ids=POSSIBLE_PRODUCT_IDS):
         self.vendor_id = vendor_id
@@ -116,29 +164,37 @@ class USBPrinterAnalyzer:
         self.interface = None
         self.endpoint_in = None
         self.endpoint_out = None
-        self.capture_data = []
+        self._in_address = None  # IN endpoint address as a plain int, set by setup_capture
+        self.capture_data = []  # Packets kept in memory when capture_traffic is not saving to a file
+        self.packet_count = 0
+        self.capture_file = None
+        self._capture_stream = None  # Output file while capture_traffic streams packets to it
         self.wireshark_capture = None
         
     def find_printer(self):
         """Find the DTG printer connected via USB"""
-        for product_id in self.product_ids:
-            try:
-                # Use the verified backend
-                dev = usb.core.find(
-                    backend=backend,
-                    idVendor=self.vendor_id, 
-                    idProduct=product_id
-                )
-                if dev is not None:
-                    print(f"Found printer with VID:PID = {self.vendor_id:04x}:{product_id:04x}")
-                    self.device = dev
-                    return True
-            except usb.core.USBError as e:
-                print(f"USB Error while searching for printer: {e}")
-                return False
-            except Exception as e:
-                print(f"Unexpected error while searching for printer: {e}")
-                return False
+        try:
+            # One pass over the bus for every candidate product ID, using the
+            # verified backend
+            devices = list(usb.core.find(
+                find_all=True,
+                backend=backend,
+                idVendor=self.vendor_id,
+                custom_match=lambda d: d.idProduct in self.product_ids
+            ))
+        except usb.core.USBError as e:
+            print(f"USB Error while searching for printer: {e}")
+            return False
+        except Exception as e:
+            print(f"Unexpected error while searching for printer: {e}")
+            return False
+        
+        if devices:
+            # Prefer the product IDs in the order they are listed
+            dev = min(devices, key=lambda d: self.product_ids.index(d.idProduct))
+            print(f"Found printer with VID:PID = {self.vendor_id:04x}:{dev.idProduct:04x}")
+            self.device = dev
+            return True
         
         print("No Epson DTG printer found. Is it connected and powered on?")
         print("\nTroubleshooting steps:")
@@ -160,9 +216,12 @@ class USBPrinterAnalyzer:
             product = usb.util.get_string(self.device, self.device.iProduct)
             serial_number = usb.util.get_string(self.device, self.device.iSerialNumber)
             
-            # Get configuration information
-            config = self.device.get_active_configuration()
-            interface_number = config[(0,0)].bInterfaceNumber
+            # Get configuration information; once setup_capture has run, the
+            # interface it found saves asking the device again
+            interface = self.interface
+            if interface is None:
+                interface = self.device.get_active_configuration()[(0,0)]
+            interface_number = interface.bInterfaceNumber
             
             return {
                 "manufacturer": manufacturer,
@@ -204,6 +263,9 @@ class USBPrinterAnalyzer:
             if not self.endpoint_in or not self.endpoint_out:
                 print("Could not find required endpoints")
                 return False
+            
+            # The capture loops use this instead of the endpoint object
+            self._in_address = self.endpoint_in.bEndpointAddress
                 
             return True
             
@@ -232,6 +294,7 @@ class USBPrinterAnalyzer:
             # Set up capture with USB filters for our device
             self.wireshark_capture = pyshark.LiveCapture(
                 interface=interface,
+                bpf_filter=self._capture_filter(interface),
                 display_filter=f'usb.idVendor == {self.vendor_id:#04x}'
             )
             
@@ -248,51 +311,60 @@ class USBPrinterAnalyzer:
                     print("    (Log out and back in for this to take effect)")
             return False
     
+    def _capture_filter(self, interface):
+        """
+        Return a BPF filter that keeps only the printer's packets, or None
+        
+        Packets dropped by a BPF filter never reach tshark's dissectors, while
+        the display filter is only applied after dissection. This is only done
+        for Linux usbmon interfaces, whose packets start with the usbmon header:
+        the device address is byte 11 and the bus number the little-endian
+        16 bits at byte 12. USBPcap numbers its buses differently from libusb.
+        """
+        if self.device is None or not interface.startswith('usbmon'):
+            return None
+        bus = self.device.bus
+        return f'link[11] = {self.device.address} and link[12] = {bus & 0xff} and link[13] = {bus >> 8}'
+    
     def analyze_packet(self, packet):
         """Analyze a USB packet captured by pyshark"""
-        if not hasattr(packet, 'usb'):
+        # pyshark finds layers and fields by searching on every attribute access,
+        # so each one is looked up once here
+        usb_layer = getattr(packet, 'usb', None)
+        if usb_layer is None:
             return None
             
         try:
             # Extract USB-specific information
             packet_info = {
                 'timestamp': packet.sniff_time.strftime('%Y-%m-%d %H:%M:%S.%f'),
-                'source': packet.usb.src,
-                'destination': packet.usb.dst,
-                'endpoint': getattr(packet.usb, 'endpoint_address', None),
+                'source': usb_layer.src,
+                'destination': usb_layer.dst,
+                'endpoint': getattr(usb_layer, 'endpoint_address', None),
                 'length': packet.length,
-                'setup_flag': hasattr(packet.usb, 'setup_flag'),
-                'data_flag': hasattr(packet.usb, 'data_flag'),
-                'status_flag': hasattr(packet.usb, 'status_flag'),
-                'direction': 'IN' if hasattr(packet.usb, 'endpoint_address_direction') 
-                            and packet.usb.endpoint_address_direction == '1' else 'OUT'
+                'setup_flag': hasattr(usb_layer, 'setup_flag'),
+                'data_flag': hasattr(usb_layer, 'data_flag'),
+                'status_flag': hasattr(usb_layer, 'status_flag'),
+                'direction': 'IN' if getattr(usb_layer, 'endpoint_address_direction', None) == '1' else 'OUT'
             }
             
             # Try to get the actual data
-            if hasattr(packet.usb, 'capdata'):
-                data = bytes.fromhex(packet.usb.capdata.replace(':', ''))
+            capdata = getattr(usb_layer, 'capdata', None)
+            if capdata is not None:
+                data = bytes.fromhex(capdata.replace(':', ''))
                 packet_info['data'] = {
-                    'hex': ' '.join(f'{b:02x}' for b in data),
-                    'ascii': ''.join(chr(b) if 32 <= b <= 126 else '.' for b in data)
+                    'hex': data.hex(' '),
+                    'ascii': _printable(data)
                 }
                 
                 # Look for known ESC/P commands
-                if data.startswith(b'\x1b'):  # ESC command
-                    if len(data) > 1:
-                        cmd = data[1:2]
-                        if cmd == b'@':
-                            packet_info['command'] = 'ESC @ (Initialize printer)'
-                        elif cmd == b'(':
-                            if len(data) > 2:
-                                subcmd = data[2:3]
-                                if subcmd == b'G':
-                                    packet_info['command'] = 'ESC ( G (Graphics mode)'
-                                elif subcmd == b'U':
-                                    packet_info['command'] = 'ESC ( U (Set unit)'
-                                elif subcmd == b'K':
-                                    packet_info['command'] = 'ESC ( K (Set color)'
-                                elif subcmd == b'i':
-                                    packet_info['command'] = 'ESC ( i (Set ink)'
+                if len(data) > 1 and data[0] == 0x1b:  # ESC command
+                    if data[1] == ord('('):
+                        command = ESC_PAREN_COMMANDS.get(data[2]) if len(data) > 2 else None
+                    else:
+                        command = ESC_COMMANDS.get(data[1])
+                    if command is not None:
+                        packet_info['command'] = command
             
             return packet_info
             
@@ -300,8 +372,14 @@ class USBPrinterAnalyzer:
             print(f"Error analyzing packet: {e}")
             return None
     
-    def capture_traffic(self, duration=30, save_to_file=True, use_wireshark=True):
-        """Capture USB traffic using both direct USB access and Wireshark if available"""
+    def capture_traffic(self, duration=30, save_to_file=True, use_wireshark=True, output_file=None,
+                        read_size=READ_SIZE):
+        """
+        Capture USB traffic using both direct USB access and Wireshark if available
+        
+        read_size is the most each bulk IN read asks for; it is rounded up to
+        whole packets.
+        """
         if use_wireshark and PYSHARK_AVAILABLE:
             if not self.start_wireshark_capture():
                 print("Falling back to direct USB capture only")
@@ -311,62 +389,281 @@ class USBPrinterAnalyzer:
         if not self.endpoint_in or not self.endpoint_out:
             print("Device not properly set up for capture")
             return False
+        
+        if save_to_file and not self._open_capture_file(output_file):
+            return False
+        
+        packet_size = self.endpoint_in.wMaxPacketSize
+        read_size = max(1, -(-read_size // packet_size)) * packet_size
             
         print(f"Starting USB traffic capture for {duration} seconds...")
-        start_time = time.time()
         
-        try:
-            while time.time() - start_time < duration:
+        # Packets are formatted and stored by a separate thread, so the capture
+        # loop only copies each one out and goes straight back to the endpoint
+        packets = queue.Queue(maxsize=FORMAT_QUEUE_SIZE)
+        format_errors = []
+        
+        def format_packets():
+            try:
+                self._format_packets(packets)
+            except BaseException as e:
+                format_errors.append(e)
+        
+        def put(packet):
+            """Queue packet for the formatter, waiting while the queue is full; False once it has stopped"""
+            while formatter.is_alive():
                 try:
-                    # Read data from the printer
-                    data = self.device.read(self.endpoint_in.bEndpointAddress, 
-                                          self.endpoint_in.wMaxPacketSize, 
-                                          timeout=100)
-                    
-                    if data:
-                        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-                        packet_data = {
-                            "timestamp": timestamp,
-                            "direction": "IN",
-                            "data": data.tolist(),
-                            "hex": ' '.join([f"{b:02x}" for b in data]),
-                            "ascii": ''.join([chr(b) if 32 <= b <= 126 else '.' for b in data])
-                        }
-                        self.capture_data.append(packet_data)
-                        print(f"IN: {packet_data['hex'][:64]}{'...' if len(packet_data['hex']) > 64 else ''}")
-                
-                except usb.core.USBError as e:
-                    # Timeout is normal, continue
-                    if e.args[0] != 'Operation timed out':
-                        print(f"USB Error: {e}")
-                
-                time.sleep(0.001)  # Short delay to prevent CPU overuse
-                
-            print(f"Capture completed. Collected {len(self.capture_data)} packets.")
+                    packets.put(packet, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        
+        formatter = threading.Thread(target=format_packets, daemon=True)
+        formatter.start()
+        
+        try:
+            try:
+                if not (USB1_AVAILABLE and self._capture_async(duration, put, read_size)):
+                    self._capture_sync(duration, put, read_size)
+            finally:
+                put(None)
+                formatter.join()
             
-            if save_to_file and self.capture_data:
-                self.save_capture_data()
+            if format_errors:
+                raise format_errors[0]
                 
+            print(f"Capture completed. Collected {self.packet_count} packets.")
             return True
             
         except KeyboardInterrupt:
             print("\nCapture stopped by user")
-            if save_to_file and self.capture_data:
-                self.save_capture_data()
             return True
             
         except Exception as e:
             print(f"Error during capture: {e}")
             return False
         
-    def save_capture_data(self):
-        """Save captured data to a file"""
+        finally:
+            if self._capture_stream is not None:
+                self._close_capture_file()
+    
+    def _open_capture_file(self, filename=None):
+        """
+        Start the capture file that capture_traffic streams packets into
+        
+        The file has the same layout save_capture_data writes, so packets are
+        written as they are captured instead of being held in capture_data.
+        capture_info goes at the end, once the packet count is known.
+        """
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"dtg_usb_capture_{timestamp}.json"
+        
+        try:
+            self._capture_stream = open(filename, 'wb', buffering=CAPTURE_WRITE_BUFFER)
+            self._capture_stream.write(b'{"packets":[')
+        except OSError as e:
+            print(f"Error opening capture file {filename}: {e}")
+            self._capture_stream = None
+            return False
+        
+        self._capture_started = datetime.now()
+        self._capture_streamed = 0
+        return True
+    
+    def _close_capture_file(self):
+        """Finish the capture file with capture_info, or remove it if no packets were captured"""
+        stream = self._capture_stream
+        self._capture_stream = None
+        
+        try:
+            if not self._capture_streamed:
+                stream.close()
+                os.remove(stream.name)
+                print("No data to save")
+                return
+            
+            stream.write(b'\n],"capture_info":')
+            stream.write(_json_bytes({
+                "timestamp": self._capture_started.strftime("%Y-%m-%d %H:%M:%S"),
+                "device_info": self.get_device_info(),
+                "packet_count": self._capture_streamed
+            }))
+            stream.write(b'}\n')
+            stream.close()
+            
+            print(f"Capture data saved to {stream.name}")
+            self.capture_file = stream.name
+            
+        except OSError as e:
+            print(f"Error saving capture data: {e}")
+            stream.close()
+        
+    def _format_packets(self, packets):
+        """Record (time.time_ns(), data) pairs from packets until it yields None"""
+        # Packets mostly arrive many to a second, so the date and time text is
+        # only rebuilt when the second changes
+        second = None
+        for timestamp, data in iter(packets.get, None):
+            seconds, nanoseconds = divmod(timestamp, 1_000_000_000)
+            if seconds != second:
+                second = seconds
+                prefix = datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S.")
+            self._record_packet(f"{prefix}{nanoseconds // 1000:06d}", data)
+    
+    def _record_packet(self, timestamp, data):
+        """Store and echo one packet read from the IN endpoint, at the given timestamp text"""
+        packet_data = {
+            "timestamp": timestamp,
+            "direction": "IN",
+            "hex": memoryview(data).hex(' '),
+            "ascii": _printable(data)
+        }
+        if self._capture_stream is not None:
+            self._capture_stream.write(b',\n' if self._capture_streamed else b'\n')
+            self._capture_stream.write(_json_bytes(packet_data))
+            self._capture_streamed += 1
+        else:
+            self.capture_data.append(packet_data)
+        self.packet_count += 1
+        print(f"IN: {packet_data['hex'][:64]}{'...' if len(packet_data['hex']) > 64 else ''}")
+    
+    def _capture_sync(self, duration, put, read_size):
+        """
+        Capture IN traffic with blocking PyUSB reads, passing (time.time_ns(), data) to put
+        
+        Stops early once put returns False (the formatter has stopped).
+        """
+        deadline = time.monotonic() + duration
+        # Bound once, as this loop runs for every read
+        monotonic = time.monotonic
+        read = self.device.read
+        address = self._in_address
+        # Every read goes into this one buffer; only what was read is copied out
+        buffer = usb.util.create_buffer(read_size)
+        view = memoryview(buffer)
+        
+        while monotonic() < deadline:
+            try:
+                # Read data from the printer
+                length = read(address, buffer, timeout=100)
+                
+                if length and not put((time.time_ns(), bytes(view[:length]))):
+                    break
+            
+            except usb.core.USBError as e:
+                # Timeout is normal, continue
+                if e.args[0] != 'Operation timed out':
+                    print(f"USB Error: {e}")
+                    # Errors return at once, unlike a timed-out read; don't spin on them
+                    time.sleep(0.1)
+    
+    def _capture_async(self, duration, put, read_size):
+        """
+        Capture IN traffic with ASYNC_TRANSFERS bulk transfers queued at once
+        
+        Each completed transfer is passed to put as (time.time_ns(), data) and
+        resubmitted straight away, so the endpoint always has a pending request.
+        Each transfer reads up to read_size bytes; capture stops once put returns
+        False (the formatter has stopped). Requires python-libusb1.
+        
+        Returns:
+            bool: False if the device could not be opened through libusb1, in which
+            case nothing was captured and the caller should use _capture_sync
+        """
+        interface_number = self.interface.bInterfaceNumber
+        endpoint = self._in_address
+        deadline = time.monotonic() + duration
+        running = True
+        pending = 0  # Transfers submitted and not yet finished for good
+        
+        def on_complete(transfer):
+            nonlocal pending, running
+            status = transfer.getStatus()
+            if status == usb1.TRANSFER_COMPLETED:
+                length = transfer.getActualLength()
+                if length and not put((time.time_ns(), bytes(memoryview(transfer.getBuffer())[:length]))):
+                    running = False
+            elif status not in (usb1.TRANSFER_TIMED_OUT, usb1.TRANSFER_CANCELLED):
+                print(f"USB Error: transfer failed with status {status}")
+                pending -= 1
+                return
+            
+            if running and time.monotonic() < deadline:
+                try:
+                    transfer.submit()
+                    return
+                except usb1.USBError as e:
+                    print(f"USB Error: {e}")
+            pending -= 1
+        
+        try:
+            usb1.loadLibrary()
+        except OSError as e:
+            print(f"Asynchronous capture unavailable ({e}), using blocking reads")
+            return False
+        
+        with usb1.USBContext() as context:
+            handle = None
+            try:
+                # Open the same physical device PyUSB found
+                for dev in context.getDeviceIterator(skip_on_error=True):
+                    if (dev.getBusNumber() == self.device.bus and
+                            dev.getDeviceAddress() == self.device.address):
+                        handle = dev.open()
+                        break
+                
+                if handle is None:
+                    return False
+                    
+                handle.claimInterface(interface_number)
+            except usb1.USBError as e:
+                print(f"Asynchronous capture unavailable ({e}), using blocking reads")
+                if handle is not None:
+                    handle.close()
+                return False
+            
+            transfers = []
+            try:
+                for _ in range(ASYNC_TRANSFERS):
+                    transfer = handle.getTransfer()
+                    transfer.setBulk(endpoint, read_size, callback=on_complete, timeout=100)
+                    transfer.submit()
+                    transfers.append(transfer)
+                    pending += 1
+                
+                # The callbacks do all the work; this only waits for them
+                handle_events = context.handleEventsTimeout
+                while pending:
+                    handle_events(0.1)
+                    
+            finally:
+                # Cancel whatever is still queued (e.g. on Ctrl+C) and wait for it
+                running = False
+                for transfer in transfers:
+                    if transfer.isSubmitted():
+                        try:
+                            transfer.cancel()
+                        except usb1.USBError:
+                            pass
+                while pending:
+                    context.handleEventsTimeout(0.1)
+                    
+                handle.releaseInterface(interface_number)
+                handle.close()
+        
+        return True
+        
+    def save_capture_data(self, filename=None):
+        """Save captured data to a file and return its path"""
         if not self.capture_data:
             print("No data to save")
-            return
+            return None
             
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"dtg_usb_capture_{timestamp}.json"
+        if not filename:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"dtg_usb_capture_{timestamp}.json"
         
         try:
             with open(filename, 'w') as f:
@@ -380,9 +677,12 @@ class USBPrinterAnalyzer:
                 }, f, indent=2)
                 
             print(f"Capture data saved to {filename}")
+            self.capture_file = filename
+            return filename
             
         except Exception as e:
             print(f"Error saving capture data: {e}")
+            return None
     
     def close(self):
         """Release the USB device"""
@@ -397,6 +697,16 @@ class USBPrinterAnalyzer:
             except Exception as e:
                 print(f"Error closing device: {e}")
 
+def _json_bytes(obj):
+    """Encode obj as compact JSON, as UTF-8 bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _printable(data):
+    """Return data as text with every byte outside printable ASCII shown as '.'"""
+    return bytes(data).translate(PRINTABLE_ASCII).decode('ascii')
+
 def print_instructions():
     """Print additional instructions for USB packet analysis"""
     print("\nAdditional Instructions:")
@@ -413,31 +723,25 @@ def print_instructions():
     print("- ESC ( K : Set color")
     print("- ESC ( i : Set ink type/density")
 
-def main():
-    parser = argparse.ArgumentParser(description="DTG Printer USB Communication Analyzer")
-    parser.add_argument("-d", "--duration", type=int, default=60, 
-                        help="Duration to capture USB traffic (seconds)")
-    parser.add_argument("-i", "--info", action="store_true", 
-                        help="Only show device information, no capture")
-    parser.add_argument("--vendor", type=lambda x: int(x, 0), default=EPSON_VENDOR_ID,
-                        help="USB Vendor ID (default: 0x04b8 for Epson)")
-    parser.add_argument("--no-wireshark", action="store_true",
-                        help="Disable Wireshark/pyshark capture even if available")
-    parser.add_argument("--interface", type=str,
-                        help="Specify Wireshark capture interface (default: auto-detect USBPcap)")
-    args = parser.parse_args()
+def capture_session(duration=60, vendor_id=EPSON_VENDOR_ID, use_wireshark=True, info_only=False,
+                    output_file=None, read_size=READ_SIZE):
+    """
+    Find the printer, capture its USB traffic and save the result
     
+    Returns:
+        tuple: (exit code, path of the saved capture file or None)
+    """
     # Check if running with sufficient privileges
     if os.geteuid() if hasattr(os, 'geteuid') else 0 != 0:
         if sys.platform != 'win32':
             print("Warning: Not running with root privileges. USB capture may fail.")
             print("Consider running with sudo if you encounter permission errors.")
     
-    analyzer = USBPrinterAnalyzer(vendor_id=args.vendor)
+    analyzer = USBPrinterAnalyzer(vendor_id=vendor_id)
     
     if not analyzer.find_printer():
         print_instructions()
-        return 1
+        return 1, None
     
     device_info = analyzer.get_device_info()
     if device_info:
@@ -445,19 +749,21 @@ def main():
         for key, value in device_info.items():
             print(f"  {key.replace('_', ' ').title()}: {value}")
     
-    if args.info:
-        return 0
+    if info_only:
+        return 0, None
     
     if not analyzer.setup_capture():
         print("Failed to set up capture. Try running with administrator/root privileges.")
         print_instructions()
-        return 1
+        return 1, None
     
     try:
         analyzer.capture_traffic(
-            duration=args.duration,
-            use_wireshark=not args.no_wireshark,
-            save_to_file=True
+            duration=duration,
+            use_wireshark=use_wireshark,
+            save_to_file=True,
+            output_file=output_file,
+            read_size=read_size
         )
     except KeyboardInterrupt:
         print("\nCapture stopped by user")
@@ -467,7 +773,35 @@ def main():
         analyzer.close()
     
     print_instructions()
-    return 0
+    return 0, analyzer.capture_file
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DTG Printer USB Communication Analyzer")
+    parser.add_argument("-d", "--duration", type=int, default=60, 
+                        help="Duration to capture USB traffic (seconds)")
+    parser.add_argument("-i", "--info", action="store_true", 
+                        help="Only show device information, no capture")
+    parser.add_argument("--vendor", type=lambda x: int(x, 0), default=EPSON_VENDOR_ID,
+                        help="USB Vendor ID (default: 0x04b8 for Epson)")
+    parser.add_argument("--no-wireshark", action="store_true",
+                        help="Disable Wireshark/pyshark capture even if available")
+    parser.add_argument("--interface", type=str,
+                        help="Specify Wireshark capture interface (default: auto-detect USBPcap)")
+    parser.add_argument("-o", "--output",
+                        help="Output JSON file for captured data (default: timestamped file in current directory)")
+    parser.add_argument("--read-size", type=int, default=READ_SIZE,
+                        help=f"Most bytes each USB read collects (default: {READ_SIZE})")
+    args = parser.parse_args(argv)
+    
+    exit_code, _ = capture_session(
+        duration=args.duration,
+        vendor_id=args.vendor,
+        use_wireshark=not args.no_wireshark,
+        info_only=args.info,
+        output_file=args.output,
+        read_size=args.read_size
+    )
+    return exit_code
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file